@@ -1,18 +1,123 @@
-from transformers import pipeline
+from typing import List
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+from ai import generation_cache, remote
+from ai.models import get_model, model_identity
+from utils import metrics
+from utils.executors import run_inference
 
-def get_cv_feedback(cv_text: str) -> str:
+# BART reads at most 1024 tokens; leave room for special tokens
+CHUNK_TOKENS = 900
+# Longer CVs keep only the first MAX_CHUNKS chunks
+MAX_CHUNKS = 8
+CHUNK_SUMMARY_KWARGS = dict(max_length=80, min_length=20, do_sample=False, truncation=True)
+FINAL_SUMMARY_KWARGS = dict(max_length=150, min_length=40, do_sample=False, truncation=True)
+
+
+def split_into_chunks(text: str, tokenizer, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens tokens.
+    Lines are kept whole where possible so that editing one section of a CV
+    only changes the chunks around that section.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+    lengths = [len(ids) for ids in tokenizer(lines, add_special_tokens=False)["input_ids"]]
+
+    chunks, current, current_tokens = [], [], 0
+    for line, n_tokens in zip(lines, lengths):
+        if n_tokens > max_tokens:
+            # A single huge line: cut it on token boundaries
+            if current:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            ids = tokenizer(line, add_special_tokens=False)["input_ids"]
+            for i in range(0, len(ids), max_tokens):
+                chunks.append(tokenizer.decode(ids[i:i + max_tokens], skip_special_tokens=True))
+            continue
+        if current_tokens + n_tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += n_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def summarize(text: str, **kwargs) -> str:
+    """
+    Summarize one text, going through the generation cache.
+    """
+    cached = generation_cache.lookup("summarizer", text, kwargs)
+    if cached is not None:
+        return cached
+    summary = get_model("summarizer")(text, **kwargs)[0]['summary_text']
+    generation_cache.store("summarizer", text, kwargs, summary)
+    return summary
+
+
+def summarize_chunks(chunks: List[str]) -> List[str]:
+    """
+    Summarize chunks in one batched call, reusing cached summaries of chunks
+    that were seen before.
+    """
+    summaries = [generation_cache.lookup("summarizer", c, CHUNK_SUMMARY_KWARGS) for c in chunks]
+    todo = list(dict.fromkeys(c for c, summary in zip(chunks, summaries) if summary is None))
+
+    if todo:
+        outputs = get_model("summarizer")(todo, batch_size=len(todo), **CHUNK_SUMMARY_KWARGS)
+        fresh = {}
+        for chunk, out in zip(todo, outputs):
+            fresh[chunk] = out['summary_text']
+            generation_cache.store("summarizer", chunk, CHUNK_SUMMARY_KWARGS, out['summary_text'])
+        summaries = [summary if summary is not None else fresh[c] for c, summary in zip(chunks, summaries)]
+    return summaries
+
+
+def get_cv_feedback(cv_text: str, chunked: bool = True) -> str:
     """
     Generate a summary/feedback for the provided CV text using a transformer model.
     Args:
         cv_text (str): The extracted text from the CV.
+        chunked (bool): Summarize the whole CV chunk by chunk and then summarize
+            the chunk summaries. If False, only the first 1000 characters are used.
     Returns:
         str: The summarized feedback.
     """
-    max_chunk = 1000
-    if len(cv_text) > max_chunk:
-        cv_text = cv_text[:max_chunk]
+    summarizer = get_model("summarizer")
+
+    if not chunked:
+        max_chunk = 1000
+        if len(cv_text) > max_chunk:
+            cv_text = cv_text[:max_chunk]
+        return summarize(cv_text, max_length=150, min_length=40, do_sample=False)
+
+    chunks = split_into_chunks(cv_text, summarizer.tokenizer)[:MAX_CHUNKS]
+    if not chunks:
+        return ""
+    if len(chunks) == 1:
+        return summarize(chunks[0], **FINAL_SUMMARY_KWARGS)
+
+    # Map: summarize every chunk in one batch; reduce: summarize the summaries
+    partial = summarize_chunks(chunks)
+    return summarize("\n".join(partial), **FINAL_SUMMARY_KWARGS)
+
 
-    summary = summarizer(cv_text, max_length=150, min_length=40, do_sample=False)
-    return summary[0]['summary_text']
+def feedback_cache_name() -> str:
+    """
+    Name of the feedback in the CV cache. Feedback from another summarizer
+    model or backend is a different value and must not be served from the cache.
+    """
+    return f"summary:{model_identity('summarizer')}"
+
+
+async def fetch_cv_feedback(cv_text: str) -> str:
+    """
+    Run get_cv_feedback on the inference pool, or on the inference worker
+    when one is configured.
+    """
+    with metrics.span("summarize"):
+        if remote.enabled():
+            return await remote.cv_feedback(cv_text)
+        return await run_inference(get_cv_feedback, cv_text)
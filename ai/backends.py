@@ -0,0 +1,117 @@
+"""
+Inference backends for the transformer pipelines.
+
+The registry in ai/models.py builds every pipeline through build_pipeline(),
+so the way a model runs on CPU is chosen per deployment:
+
+- ``torch``: the full-precision PyTorch model (default).
+- ``int8``: the PyTorch model with its Linear layers dynamically quantized
+  to int8; roughly halves memory and speeds up CPU matmuls.
+- ``onnx``: the model exported to ONNX and run with ONNX Runtime through
+  ``optimum`` (``pip install optimum[onnxruntime]``). Exports are kept under
+  ONNX_DIR so they are only done once.
+
+The backend is set with CVBOT_INFERENCE_BACKEND, or per model with
+CVBOT_<NAME>_BACKEND (e.g. CVBOT_SUMMARIZER_BACKEND=onnx). Thread counts are
+set with CVBOT_INTRA_OP_THREADS and CVBOT_INTER_OP_THREADS and apply to both
+PyTorch and ONNX Runtime.
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict
+
+DEFAULT_BACKEND = os.environ.get("CVBOT_INFERENCE_BACKEND", "torch")
+ONNX_DIR = os.environ.get("CVBOT_ONNX_DIR", os.path.join(os.environ.get("CVBOT_CACHE_DIR", "cache"), "onnx"))
+# 0 leaves the library default (usually one thread per core)
+INTRA_OP_THREADS = int(os.environ.get("CVBOT_INTRA_OP_THREADS", 0))
+INTER_OP_THREADS = int(os.environ.get("CVBOT_INTER_OP_THREADS", 0))
+
+_threads_configured = False
+_threads_lock = threading.Lock()
+
+
+def backend_for(name: str) -> str:
+    """
+    Return the backend configured for registry model ``name``.
+    """
+    backend = os.environ.get(f"CVBOT_{name.upper()}_BACKEND", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend for {name}: {backend} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+def configure_threads() -> None:
+    """
+    Apply the PyTorch thread settings once per process. The inter-op setting
+    can only be changed before PyTorch runs any parallel work.
+    """
+    global _threads_configured
+    with _threads_lock:
+        if _threads_configured:
+            return
+        _threads_configured = True
+        import torch
+
+        if INTRA_OP_THREADS:
+            torch.set_num_threads(INTRA_OP_THREADS)
+        if INTER_OP_THREADS:
+            try:
+                torch.set_num_interop_threads(INTER_OP_THREADS)
+            except RuntimeError:
+                logging.warning("Could not set PyTorch inter-op threads; parallel work has already started.")
+
+
+def _load_torch(task: str, model_id: str):
+    from transformers import pipeline
+
+    return pipeline(task, model=model_id)
+
+
+def _load_int8(task: str, model_id: str):
+    import torch
+
+    pipe = _load_torch(task, model_id)
+    pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
+
+
+def _load_onnx(task: str, model_id: str):
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForCausalLM, ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    model_class = ORTModelForCausalLM if task == "text-generation" else ORTModelForSeq2SeqLM
+    options = onnxruntime.SessionOptions()
+    if INTRA_OP_THREADS:
+        options.intra_op_num_threads = INTRA_OP_THREADS
+    if INTER_OP_THREADS:
+        options.inter_op_num_threads = INTER_OP_THREADS
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+
+    export_dir = os.path.join(ONNX_DIR, model_id.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = model_class.from_pretrained(export_dir, session_options=options)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        logging.info("Exporting %s to ONNX in %s", model_id, export_dir)
+        model = model_class.from_pretrained(model_id, export=True, session_options=options)
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline(task, model=model, tokenizer=tokenizer)
+
+
+BACKENDS: Dict[str, Callable] = {
+    "torch": _load_torch,
+    "int8": _load_int8,
+    "onnx": _load_onnx,
+}
+
+
+def build_pipeline(task: str, model_id: str, backend: str):
+    """
+    Build a transformers pipeline for ``model_id`` on the given backend.
+    """
+    configure_threads()
+    return BACKENDS[backend](task, model_id)
@@ -0,0 +1,126 @@
+"""
+Micro-batching in front of the text-generation pipelines.
+
+Prompts submitted by concurrent commands are collected for up to MAX_WAIT
+seconds (or until MAX_BATCH_SIZE prompts are waiting) and then generated
+together in one padded batch. Prompts are only batched with others that use
+the same model and generation arguments. While a batch is running, new
+prompts keep accumulating and go out as the next batch. Deterministic
+prompts seen before are answered from the generation cache without queueing.
+"""
+import asyncio
+import logging
+import os
+from typing import Dict, List, Tuple
+
+from ai import generation_cache, remote
+from ai.models import get_model
+from utils import metrics, scheduler
+from utils.executors import run_blocking, run_inference
+
+MAX_BATCH_SIZE = int(os.environ.get("CVBOT_LLM_MAX_BATCH", 8))
+MAX_WAIT = float(os.environ.get("CVBOT_LLM_MAX_WAIT_MS", 20)) / 1000
+
+_pending: Dict[tuple, List[Tuple[str, asyncio.Future]]] = {}
+_timers: Dict[tuple, asyncio.TimerHandle] = {}
+_running: set = set()
+_stats = {"batches": 0, "prompts": 0, "max_batch": 0}
+
+
+def _generate_batch(model_name: str, prompts: List[str], kwargs: dict) -> List[str]:
+    pipe = get_model(model_name)
+    tokenizer = pipe.tokenizer
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    # Decoder-only models must be padded on the left to generate correctly
+    tokenizer.padding_side = "left"
+    outputs = pipe(prompts, batch_size=len(prompts), **kwargs)
+    return [out[0]['generated_text'] for out in outputs]
+
+
+def _schedule(key: tuple) -> None:
+    if key in _running or key in _timers or not _pending.get(key):
+        return
+    if len(_pending[key]) >= MAX_BATCH_SIZE:
+        _flush(key)
+    else:
+        _timers[key] = asyncio.get_running_loop().call_later(MAX_WAIT, _flush, key)
+
+
+def _flush(key: tuple) -> None:
+    timer = _timers.pop(key, None)
+    if timer is not None:
+        timer.cancel()
+    if key in _running:
+        return
+    queue = _pending.get(key, [])
+    # Drop prompts whose callers gave up while waiting
+    queue[:] = [(prompt, fut) for prompt, fut in queue if not fut.done()]
+    batch, queue[:] = queue[:MAX_BATCH_SIZE], queue[MAX_BATCH_SIZE:]
+    if not batch:
+        return
+    _running.add(key)
+    asyncio.ensure_future(_run_batch(key, batch))
+
+
+async def _run_batch(key: tuple, batch: List[Tuple[str, asyncio.Future]]) -> None:
+    model_name, kwargs = key
+    _stats["batches"] += 1
+    _stats["prompts"] += len(batch)
+    _stats["max_batch"] = max(_stats["max_batch"], len(batch))
+    try:
+        outputs = await run_inference(_generate_batch, model_name, [p for p, _ in batch], dict(kwargs))
+    except Exception as e:
+        logging.exception("An error occurred while generating a batch of %d prompts.", len(batch))
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(e)
+    else:
+        for (_, fut), output in zip(batch, outputs):
+            if not fut.done():
+                fut.set_result(output)
+    finally:
+        _running.discard(key)
+        _schedule(key)
+
+
+async def generate(prompt: str, model: str = "chat", **gen_kwargs) -> str:
+    """
+    Generate text for a prompt, batched with other in-flight prompts.
+    Args:
+        prompt (str): The prompt.
+        model (str): Registry name of a text-generation model.
+        **gen_kwargs: Generation arguments passed to the pipeline, e.g. max_new_tokens.
+    Returns:
+        str: The generated text (including the prompt, as the pipeline returns it).
+    Raises:
+        Overloaded: If the scheduler's LLM queue is full.
+    """
+    cached = await run_blocking(generation_cache.lookup, model, prompt, gen_kwargs)
+    if cached is not None:
+        return cached
+
+    if remote.enabled():
+        # The inference worker batches, and stores the output in the shared cache
+        async with scheduler.slot("llm"):
+            with metrics.span("llm_generate"):
+                return await remote.generate(prompt, model, **gen_kwargs)
+
+    key = (model, tuple(sorted(gen_kwargs.items())))
+    async with scheduler.slot("llm"):
+        with metrics.span("llm_generate"):
+            fut = asyncio.get_running_loop().create_future()
+            _pending.setdefault(key, []).append((prompt, fut))
+            if len(_pending[key]) >= MAX_BATCH_SIZE and key not in _running:
+                _flush(key)
+            else:
+                _schedule(key)
+            output = await fut
+    await run_blocking(generation_cache.store, model, prompt, gen_kwargs, output)
+    return output
+
+
+def batch_stats() -> dict:
+    stats = dict(_stats, waiting=sum(len(q) for q in _pending.values()))
+    stats["avg_batch"] = stats["prompts"] / stats["batches"] if stats["batches"] else 0.0
+    return stats
@@ -0,0 +1,51 @@
+"""
+Cache of model outputs keyed on model, prompt and generation arguments.
+
+Deterministic calls (greedy / beam search) always produce the same output for
+the same input, so their results are kept in an in-memory LRU backed by a
+size-capped SQLite file. Calls with ``do_sample=True`` bypass the cache.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+from ai.models import model_identity
+from utils.tiered_cache import TieredCache
+
+CACHE_DIR = os.environ.get("CVBOT_CACHE_DIR", "cache")
+MEMORY_ENTRIES = int(os.environ.get("CVBOT_GEN_CACHE_ENTRIES", 1024))
+DISK_MAX_BYTES = int(os.environ.get("CVBOT_GEN_CACHE_MAX_BYTES", 100 * 2**20))
+
+_cache = TieredCache(os.path.join(CACHE_DIR, "generation_cache.sqlite3"), MEMORY_ENTRIES, DISK_MAX_BYTES)
+_bypassed = 0
+
+
+def is_cacheable(gen_kwargs: dict) -> bool:
+    return not gen_kwargs.get("do_sample", False)
+
+
+def make_key(model_name: str, prompt: str, gen_kwargs: dict) -> str:
+    payload = json.dumps([model_identity(model_name), prompt, sorted(gen_kwargs.items())], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(model_name: str, prompt: str, gen_kwargs: dict) -> Optional[Any]:
+    """
+    Return the cached output for this call, or None on a miss or when the
+    call samples and must not be cached.
+    """
+    global _bypassed
+    if not is_cacheable(gen_kwargs):
+        _bypassed += 1
+        return None
+    return _cache.get(make_key(model_name, prompt, gen_kwargs))
+
+
+def store(model_name: str, prompt: str, gen_kwargs: dict, output: Any) -> None:
+    if is_cacheable(gen_kwargs):
+        _cache.put(make_key(model_name, prompt, gen_kwargs), output)
+
+
+def cache_stats() -> dict:
+    return dict(_cache.stats(), bypassed=_bypassed)
@@ -0,0 +1,209 @@
+"""
+Central registry for the transformer pipelines used by the bot.
+
+Every command asks this module for a model by name instead of building its own
+pipeline, so each model is loaded at most once per process. Models are loaded
+lazily on first use (or up front with ``warm_up``) and unloaded again after
+they have been idle for ``IDLE_TIMEOUT`` seconds. How a model runs (PyTorch,
+int8 or ONNX Runtime) is chosen per model in ai/backends.py.
+"""
+import gc
+import logging
+import os
+import resource
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from ai.backends import backend_for, build_pipeline
+
+# name -> (pipeline task, Hugging Face model id)
+MODEL_SPECS = {
+    "summarizer": ("summarization", "facebook/bart-large-cnn"),
+    "chat": ("text-generation", "TinyLlama/TinyLlama-1.1B-Chat-v1.0"),
+}
+
+# Seconds a model may sit unused before it is unloaded (0 disables unloading)
+IDLE_TIMEOUT = float(os.environ.get("CVBOT_MODEL_IDLE_TIMEOUT", 30 * 60))
+_REAPER_INTERVAL = 60
+
+_models: Dict[str, object] = {}
+_tokenizers: Dict[str, object] = {}
+_stats: Dict[str, dict] = {}
+_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in MODEL_SPECS}
+_reaper: Optional[threading.Thread] = None
+_reaper_lock = threading.Lock()
+
+
+def _current_rss() -> int:
+    """
+    Return the resident set size of this process in bytes.
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _load(name: str):
+    task, model_id = MODEL_SPECS[name]
+    backend = backend_for(name)
+    rss_before = _current_rss()
+    start = time.perf_counter()
+    model = build_pipeline(task, model_id, backend)
+    load_seconds = time.perf_counter() - start
+    rss_bytes = max(0, _current_rss() - rss_before)
+
+    stats = _stats.setdefault(name, {"loads": 0})
+    stats.update(
+        model_id=model_id,
+        backend=backend,
+        load_seconds=load_seconds,
+        rss_bytes=rss_bytes,
+        loaded_at=time.time(),
+    )
+    stats["loads"] += 1
+    logging.info(
+        "Loaded model %s (%s, %s) in %.1fs, ~%.0f MiB resident",
+        name, model_id, backend, load_seconds, rss_bytes / 2**20,
+    )
+    return model
+
+
+def model_identity(name: str) -> str:
+    """
+    Return a string identifying exactly which model serves ``name``,
+    for use in cache keys. Quantized and ONNX backends produce slightly
+    different outputs, so they get their own identity.
+    """
+    task, model_id = MODEL_SPECS[name]
+    backend = backend_for(name)
+    if backend == "torch":
+        return f"{task}:{model_id}"
+    return f"{task}:{model_id}@{backend}"
+
+
+def get_model(name: str):
+    """
+    Return the shared pipeline for ``name``, loading it on first use.
+    Args:
+        name (str): A key of MODEL_SPECS, e.g. "chat" or "summarizer".
+    Returns:
+        The transformers pipeline instance.
+    """
+    if name not in MODEL_SPECS:
+        raise KeyError(f"Unknown model: {name}")
+    model = _models.get(name)
+    if model is None:
+        with _locks[name]:
+            model = _models.get(name)
+            if model is None:
+                model = _load(name)
+                _models[name] = model
+                _start_reaper()
+    _stats[name]["last_used"] = time.time()
+    return model
+
+
+def get_tokenizer(name: str):
+    """
+    Return the tokenizer of model ``name`` without loading the model weights.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model.tokenizer
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is None:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_SPECS[name][1])
+        _tokenizers[name] = tokenizer
+    return tokenizer
+
+
+def unload_model(name: str) -> bool:
+    """
+    Drop the shared instance of ``name`` so its memory can be reclaimed.
+    Returns True if a model was unloaded.
+    """
+    with _locks[name]:
+        model = _models.pop(name, None)
+    if model is None:
+        return False
+    del model
+    gc.collect()
+    _stats[name]["loaded_at"] = None
+    logging.info("Unloaded idle model %s", name)
+    return True
+
+
+def unload_idle_models(now: Optional[float] = None) -> None:
+    """
+    Unload every model that has not been used for IDLE_TIMEOUT seconds.
+    """
+    if IDLE_TIMEOUT <= 0:
+        return
+    now = now or time.time()
+    for name in list(_models):
+        last_used = _stats.get(name, {}).get("last_used", now)
+        if now - last_used > IDLE_TIMEOUT:
+            unload_model(name)
+
+
+def _reap_forever() -> None:
+    while True:
+        time.sleep(_REAPER_INTERVAL)
+        try:
+            unload_idle_models()
+        except Exception:
+            logging.exception("An error occurred while unloading idle models.")
+
+
+def _start_reaper() -> None:
+    global _reaper
+    if IDLE_TIMEOUT <= 0:
+        return
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_forever, name="model-reaper", daemon=True)
+            _reaper.start()
+
+
+def warm_up(names: Optional[Iterable[str]] = None, background: bool = True) -> None:
+    """
+    Load models ahead of their first use.
+    Args:
+        names: Model names to load; defaults to every registered model.
+        background (bool): Load in a daemon thread so startup is not blocked.
+    """
+    names = list(names or MODEL_SPECS)
+
+    def load_all() -> None:
+        for name in names:
+            try:
+                get_model(name)
+            except Exception:
+                logging.exception("An error occurred while warming up model %s.", name)
+
+    if background:
+        threading.Thread(target=load_all, name="model-warmup", daemon=True).start()
+    else:
+        load_all()
+
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+
+def model_stats() -> Dict[str, dict]:
+    """
+    Return load time, resident memory and usage info for every model
+    that has been loaded at least once.
+    """
+    return {
+        name: dict(stats, loaded=name in _models)
+        for name, stats in _stats.items()
+    }
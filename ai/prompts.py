@@ -0,0 +1,161 @@
+"""
+Token-aware prompt building for the TinyLlama prompts.
+
+Instead of cutting texts at a fixed number of characters, CVs and job
+descriptions are split into sections, low-value lines (contact details,
+addresses, page numbers, repeated headers) are dropped, and lines are kept in
+order of section relevance (skills and experience first) until the prompt's
+token budget is used up. The kept lines are emitted in their original order.
+
+Every prompt starts with a fixed instruction prefix so that the prefix is
+identical across requests.
+"""
+import re
+from typing import Optional
+
+from ai.models import get_tokenizer
+from utils.text_analyzer import SECTION_KEYWORDS, SUMMARY_KEYWORDS
+
+SKILLS_INSTRUCTION = (
+    "Extract a list of the main required skills and technologies from the following job description or CV. "
+    "Return only a comma-separated list of skills, no explanations.\n\n"
+)
+INTERVIEW_INSTRUCTION = (
+    "Given the following job description and candidate CV, generate 1-5 likely interview questions the candidate might face. "
+    "Focus on the required skills, experience, and any gaps.\n\n"
+)
+
+# TinyLlama's context window
+CONTEXT_TOKENS = 2048
+# Tokens kept free for special tokens
+SAFETY_MARGIN = 16
+
+# heading keyword -> section; job description headings map onto CV sections
+_HEADINGS = {keyword: section for section, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+_HEADINGS.update({keyword: "summary" for keyword in SUMMARY_KEYWORDS})
+_HEADINGS.update({
+    "requirements": "skills", "qualifications": "skills", "what you bring": "skills",
+    "tech stack": "skills", "technologies": "skills", "must have": "skills", "nice to have": "skills",
+    "responsibilities": "experience", "what you will do": "experience", "your role": "experience",
+    "about us": "other", "benefits": "other", "what we offer": "other", "languages": "other",
+    "interests": "other", "hobbies": "other", "references": "other",
+})
+# Lower is kept first
+SECTION_PRIORITY = {"skills": 0, "experience": 1, "projects": 2, "summary": 3, "intro": 3, "education": 4, "other": 5}
+
+_LOW_VALUE = [
+    re.compile(r'^\S+@\S+\.\S+$'),                                   # email only
+    re.compile(r'^[\d\s()+./-]{7,}$'),                               # phone only
+    re.compile(r'^(https?://|www\.)\S+$', re.IGNORECASE),            # bare URL
+    re.compile(r'^page \d+( of \d+)?$', re.IGNORECASE),
+    # Street address, optionally followed by ", city": the whole part, so achievements
+    # like "Led 3 engineers on Main Street redesign" are kept
+    re.compile(
+        r'^\d+[a-z]?,?\s+(\w+\s+){0,3}(street|st|avenue|ave|road|rd|boulevard|blvd|lane|ln|rue|strasse|straße)\.?'
+        r'(,\s*[\w\s.-]*)?$',
+        re.IGNORECASE,
+    ),
+    re.compile(r'^\d{5}\s+[A-Z][a-z]+(\s+[A-Z][a-z]+)*$'),          # postcode + city
+]
+
+
+def _heading(line: str) -> Optional[str]:
+    words = line.strip(" :•-*#").lower()
+    if not words or len(words.split()) > 4:
+        return None
+    return _HEADINGS.get(words)
+
+
+def _is_low_value(line: str) -> bool:
+    # Contact lines ("a@b.com | +1 555 | linkedin.com/in/x") are low value as a whole
+    parts = [p.strip() for p in re.split(r'[|·•]', line) if p.strip()]
+    return all(any(p.search(part) for p in _LOW_VALUE) for part in parts) if parts else True
+
+
+def pack_text(text: str, budget: int, tokenizer=None, kind: str = "cv") -> str:
+    """
+    Keep the most relevant lines of a CV or job description within a token budget.
+    Args:
+        text (str): The CV or job description.
+        budget (int): Maximum number of tokens for the packed text.
+        tokenizer: Tokenizer used to count tokens (defaults to the chat model's).
+        kind (str): "cv" or "job"; the opening lines of a job description
+            (title, company) are worth more than a CV's name and address block.
+    Returns:
+        str: The selected lines in their original order.
+    """
+    tokenizer = tokenizer or get_tokenizer("chat")
+    section = "intro" if kind == "job" else "other"
+    header = None
+    seen = set()
+    lines = []  # (priority, index, line, index of its section heading)
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            continue
+        heading = _heading(line)
+        key = line.lower()
+        if key in seen or (not heading and _is_low_value(line)):
+            continue  # repeated headers/footers, contact details, addresses
+        seen.add(key)
+        if heading:
+            section, header = heading, len(lines)
+        lines.append((SECTION_PRIORITY.get(section, 5), len(lines), line, None if heading else header))
+    if not lines:
+        return ""
+
+    counts = tokenizer([line for _, _, line, _ in lines], add_special_tokens=False)["input_ids"]
+    # +1 for the newline joining the lines
+    costs = [len(ids) + 1 for ids in counts]
+    kept = set()
+    used = 0
+    for priority, index, line, header in sorted(lines):
+        if header is None and _heading(line):
+            continue  # headings are only kept together with their content
+        cost = costs[index] + (costs[header] if header is not None and header not in kept else 0)
+        if used + cost > budget:
+            continue
+        kept.add(index)
+        if header is not None:
+            kept.add(header)
+        used += cost
+    return "\n".join(lines[i][2] for i in sorted(kept))
+
+
+def _count(tokenizer, text: str) -> int:
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"]) if text else 0
+
+
+def _budget(tokenizer, fixed: str, max_new_tokens: int) -> int:
+    context = min(CONTEXT_TOKENS, getattr(tokenizer, "model_max_length", CONTEXT_TOKENS) or CONTEXT_TOKENS)
+    fixed_tokens = len(tokenizer(fixed)["input_ids"])
+    return max(0, context - max_new_tokens - fixed_tokens - SAFETY_MARGIN)
+
+
+def build_skills_prompt(text: str, max_new_tokens: int = 60, kind: str = "cv") -> str:
+    """
+    Build the skill extraction prompt, packing the text into the context window.
+    """
+    tokenizer = get_tokenizer("chat")
+    budget = _budget(tokenizer, SKILLS_INSTRUCTION + "Text:\n\n\nSkills:", max_new_tokens)
+    return f"{SKILLS_INSTRUCTION}Text:\n{pack_text(text, budget, tokenizer, kind)}\n\nSkills:"
+
+
+def build_interview_prompt(job_desc: str, cv_text: str, max_new_tokens: int = 200) -> str:
+    """
+    Build the interview question prompt. The job description and the CV share
+    the budget equally; whatever one of them does not need goes to the other.
+    """
+    tokenizer = get_tokenizer("chat")
+    frame = INTERVIEW_INSTRUCTION + "Job Description:\n\n\nCandidate CV:\n\n\nInterview Questions:"
+    budget = _budget(tokenizer, frame, max_new_tokens)
+    job = pack_text(job_desc, budget // 2, tokenizer, kind="job")
+    cv = pack_text(cv_text, budget - _count(tokenizer, job), tokenizer, kind="cv")
+    # If the CV did not need its half, give the rest back to the job description
+    job = pack_text(job_desc, budget - _count(tokenizer, cv), tokenizer, kind="job")
+    return (
+        f"{INTERVIEW_INSTRUCTION}"
+        f"Job Description:\n{job}\n\n"
+        f"Candidate CV:\n{cv}\n\n"
+        "Interview Questions:"
+    )
@@ -0,0 +1,123 @@
+"""
+Client for a separate inference worker (ai/worker.py).
+
+When CVBOT_INFERENCE_URL is set, the bot process does not load any model.
+Generation, streaming and CV summaries are sent to the worker over HTTP
+instead, so the Discord front-end restarts in seconds and inference can run
+on other cores or machines. Several worker replicas can be listed, comma
+separated; each request goes to the replica with the fewest requests in
+flight.
+"""
+import json
+import os
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from utils.scheduler import Overloaded
+
+INFERENCE_URLS: List[str] = [
+    url.strip().rstrip("/") for url in os.environ.get("CVBOT_INFERENCE_URL", "").split(",") if url.strip()
+]
+# Generation can take minutes under load; only connecting is bounded tightly
+TIMEOUT = aiohttp.ClientTimeout(total=None, connect=5, sock_read=float(os.environ.get("CVBOT_INFERENCE_TIMEOUT", 600)))
+
+_session: Optional[aiohttp.ClientSession] = None
+_in_flight: Dict[str, int] = {url: 0 for url in INFERENCE_URLS}
+
+
+class RemoteInferenceError(Exception):
+    """
+    Raised when the inference worker cannot be reached or fails a request.
+    """
+
+
+def enabled() -> bool:
+    return bool(INFERENCE_URLS)
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(timeout=TIMEOUT)
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _pick() -> str:
+    return min(INFERENCE_URLS, key=lambda url: _in_flight[url])
+
+
+async def _raise_for_status(resp: aiohttp.ClientResponse) -> None:
+    if resp.status < 400:
+        return
+    try:
+        body = await resp.json()
+    except (aiohttp.ContentTypeError, ValueError):
+        body = {"error": await resp.text()}
+    if resp.status == 503 and "resource" in body:
+        raise Overloaded(body["resource"], body.get("eta", 0.0))
+    raise RemoteInferenceError(f"Inference worker returned {resp.status}: {body.get('error')}")
+
+
+async def _post(path: str, payload: dict) -> dict:
+    url = _pick()
+    _in_flight[url] += 1
+    try:
+        async with get_session().post(url + path, json=payload) as resp:
+            await _raise_for_status(resp)
+            return await resp.json()
+    except aiohttp.ClientError as e:
+        raise RemoteInferenceError(f"Inference worker {url} is unreachable: {e}") from e
+    finally:
+        _in_flight[url] -= 1
+
+
+async def generate(prompt: str, model: str = "chat", **gen_kwargs) -> str:
+    """
+    Same contract as ai.batching.generate; the worker batches the prompt with
+    the other prompts it receives.
+    """
+    result = await _post("/generate", {"prompt": prompt, "model": model, "kwargs": gen_kwargs})
+    return result["text"]
+
+
+async def stream_generate(prompt: str, model: str = "chat", **gen_kwargs) -> AsyncIterator[str]:
+    """
+    Same contract as ai.streaming.stream_generate. The worker answers with one
+    JSON object per line as text is produced.
+    """
+    url = _pick()
+    _in_flight[url] += 1
+    try:
+        payload = {"prompt": prompt, "model": model, "kwargs": gen_kwargs}
+        async with get_session().post(url + "/stream", json=payload) as resp:
+            await _raise_for_status(resp)
+            async for line in resp.content:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise RemoteInferenceError(f"Inference worker failed: {message['error']}")
+                if message.get("done"):
+                    return
+                yield message["text"]
+        raise RemoteInferenceError("Inference worker closed the stream early.")
+    except aiohttp.ClientError as e:
+        raise RemoteInferenceError(f"Inference worker {url} is unreachable: {e}") from e
+    finally:
+        _in_flight[url] -= 1
+
+
+async def cv_feedback(cv_text: str) -> str:
+    """
+    Same contract as ai.ai_feedback.get_cv_feedback.
+    """
+    result = await _post("/feedback", {"text": cv_text})
+    return result["text"]
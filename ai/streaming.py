@@ -0,0 +1,109 @@
+"""
+Token streaming for the text-generation pipelines.
+
+stream_generate() runs model.generate() on the inference pool with a streamer
+that hands each decoded piece of text back to the event loop as soon as it is
+produced, so callers can act on the first words while the rest is still being
+generated. Streams are not batched with other prompts; deterministic outputs
+are read from and written to the generation cache like batched ones.
+"""
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator
+
+from ai import generation_cache, remote
+from ai.models import get_model
+from utils import metrics, scheduler
+from utils.executors import run_blocking, run_inference
+
+_DONE = object()
+
+
+def _stream_worker(model_name: str, prompt: str, gen_kwargs: dict, emit, stop: threading.Event) -> None:
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextStreamer
+
+    class _LoopStreamer(TextStreamer):
+        def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+            if text:
+                emit(text)
+
+    class _StopWhenCancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            return stop.is_set()
+
+    pipe = get_model(model_name)
+    tokenizer = pipe.tokenizer
+    inputs = tokenizer(prompt, return_tensors="pt").to(pipe.model.device)
+    if tokenizer.pad_token_id is None:
+        gen_kwargs.setdefault("pad_token_id", tokenizer.eos_token_id)
+    pipe.model.generate(
+        **inputs,
+        streamer=_LoopStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True),
+        stopping_criteria=StoppingCriteriaList([_StopWhenCancelled()]),
+        **gen_kwargs,
+    )
+
+
+async def stream_generate(prompt: str, model: str = "chat", **gen_kwargs) -> AsyncIterator[str]:
+    """
+    Generate text for a prompt, yielding it piece by piece as it is decoded.
+    Args:
+        prompt (str): The prompt.
+        model (str): Registry name of a text-generation model.
+        **gen_kwargs: Generation arguments, e.g. max_new_tokens.
+    Yields:
+        str: Newly generated text (without the prompt). A cached output is
+            yielded in one piece.
+    Raises:
+        Overloaded: If the scheduler's LLM queue is full.
+    """
+    cached = await run_blocking(generation_cache.lookup, model, prompt, gen_kwargs)
+    if cached is not None:
+        yield cached[len(prompt):] if cached.startswith(prompt) else cached
+        return
+
+    if remote.enabled():
+        async with scheduler.slot("llm"):
+            with metrics.span("llm_stream"):
+                async for piece in remote.stream_generate(prompt, model, **gen_kwargs):
+                    yield piece
+        return
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def emit(text: str) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, text)
+
+    async def run() -> None:
+        try:
+            await run_inference(_stream_worker, model, prompt, dict(gen_kwargs), emit, stop)
+        except Exception as e:
+            logging.exception("An error occurred while streaming a generation.")
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(_DONE)
+
+    pieces = []
+    completed = False
+    async with scheduler.slot("llm"):
+        with metrics.span("llm_stream"):
+            task = asyncio.ensure_future(run())
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is _DONE:
+                        completed = True
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    pieces.append(item)
+                    yield item
+            finally:
+                if not completed:
+                    # The caller stopped reading; stop the model at the next token
+                    stop.set()
+    # Stored like the pipeline's generated_text, which includes the prompt
+    await run_blocking(generation_cache.store, model, prompt, gen_kwargs, prompt + "".join(pieces))
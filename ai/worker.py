@@ -0,0 +1,157 @@
+"""
+Standalone inference worker.
+
+Hosts the models behind a small HTTP interface so that the Discord front-end
+(bot.py with CVBOT_INFERENCE_URL set) does not load them itself:
+
+- ``POST /generate`` ``{"prompt", "model", "kwargs"}`` -> ``{"text"}``;
+  prompts from all front-ends are batched together (ai/batching.py).
+- ``POST /stream`` with the same body -> one JSON object per line,
+  ``{"text"}`` pieces followed by ``{"done": true}``.
+- ``POST /feedback`` ``{"text"}`` -> ``{"text"}``, the CV summary.
+- ``GET /health`` -> model, batching, pool and cache statistics.
+- ``GET /metrics`` -> the same timings and counters as the bot (utils/metrics.py).
+
+A 503 with ``{"error", "resource", "eta"}`` means the worker's queue is full.
+With ``--stub`` no model is loaded and canned outputs are returned, which is
+enough to exercise the front-end and the interface locally.
+
+Usage: python -m ai.worker [--host 127.0.0.1] [--port 8765] [--warmup chat,summarizer] [--stub]
+"""
+import argparse
+import json
+import logging
+
+from aiohttp import web
+
+from ai import generation_cache, remote
+from ai.ai_feedback import get_cv_feedback
+from ai.batching import batch_stats, generate
+from ai.models import model_stats, warm_up
+from ai.streaming import stream_generate
+from utils.executors import pool_stats, run_inference
+from utils import metrics, scheduler
+from utils.logs import configure_logging
+from utils.scheduler import Overloaded, scheduler_stats
+
+STUB_SKILLS = " Python, SQL, Docker, Communication"
+STUB_QUESTIONS = (
+    " 1. Can you walk me through a project where you used Python in production?\n"
+    "2. How do you approach debugging a failing deployment?\n"
+    "3. Which of the required skills would you like to improve, and how?\n"
+)
+STUB_FEEDBACK = "The CV is clearly structured and lists relevant experience; quantify more achievements."
+
+
+def _stub_completion(prompt: str) -> str:
+    return STUB_QUESTIONS if prompt.rstrip().endswith("Interview Questions:") else STUB_SKILLS
+
+
+async def _iter_stub(text: str):
+    for word in text.split(" "):
+        yield word + " "
+
+
+def _overloaded(e: Overloaded) -> web.Response:
+    return web.json_response({"error": str(e), "resource": e.resource, "eta": e.eta}, status=503)
+
+
+async def handle_generate(request: web.Request) -> web.Response:
+    body = await request.json()
+    if request.app["stub"]:
+        return web.json_response({"text": body["prompt"] + _stub_completion(body["prompt"])})
+    try:
+        text = await generate(body["prompt"], body.get("model", "chat"), **body.get("kwargs", {}))
+    except Overloaded as e:
+        return _overloaded(e)
+    return web.json_response({"text": text})
+
+
+async def handle_stream(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    if request.app["stub"]:
+        pieces = _iter_stub(_stub_completion(body["prompt"]))
+    else:
+        pieces = stream_generate(body["prompt"], body.get("model", "chat"), **body.get("kwargs", {}))
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    started = False
+    try:
+        async for piece in pieces:
+            if not started:
+                await response.prepare(request)
+                started = True
+            await response.write(json.dumps({"text": piece}).encode("utf-8") + b"\n")
+        if not started:
+            await response.prepare(request)
+        await response.write(b'{"done": true}\n')
+    except Overloaded as e:
+        if not started:
+            return _overloaded(e)
+        await response.write(json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+    except ConnectionResetError:
+        # The front-end went away; closing the generator stops the model
+        return response
+    except Exception as e:
+        logging.exception("An error occurred while streaming a generation.")
+        if not started:
+            await response.prepare(request)
+        await response.write(json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+    finally:
+        await pieces.aclose()
+    await response.write_eof()
+    return response
+
+
+async def handle_feedback(request: web.Request) -> web.Response:
+    body = await request.json()
+    if request.app["stub"]:
+        return web.json_response({"text": STUB_FEEDBACK})
+    try:
+        text = await scheduler.run("summarizer", run_inference, get_cv_feedback, body["text"])
+    except Overloaded as e:
+        return _overloaded(e)
+    return web.json_response({"text": text})
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "stub": request.app["stub"],
+        "models": model_stats(),
+        "batching": batch_stats(),
+        "pools": pool_stats(),
+        "scheduler": scheduler_stats(),
+        "generation_cache": generation_cache.cache_stats(),
+    })
+
+
+def make_app(stub: bool = False) -> web.Application:
+    app = web.Application(client_max_size=16 * 2**20)
+    app["stub"] = stub
+    app.add_routes([
+        web.post("/generate", handle_generate),
+        web.post("/stream", handle_stream),
+        web.post("/feedback", handle_feedback),
+        web.get("/health", handle_health),
+        web.get("/metrics", metrics.handle_metrics),
+    ])
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CVHelperBot inference worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--warmup", default="", help="comma-separated models to load at startup")
+    parser.add_argument("--stub", action="store_true", help="serve canned outputs without loading models")
+    args = parser.parse_args()
+    if remote.enabled():
+        parser.error("CVBOT_INFERENCE_URL must not be set for the worker itself")
+
+    configure_logging(path=None)
+    if args.warmup and not args.stub:
+        warm_up([name.strip() for name in args.warmup.split(",") if name.strip()])
+    web.run_app(make_app(stub=args.stub), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
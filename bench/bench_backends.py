@@ -0,0 +1,119 @@
+"""
+Compare inference backends (ai/backends.py) for the bot's models: load time,
+latency, memory and agreement of the outputs with the full-precision PyTorch
+pipeline.
+
+Each backend runs in its own process so memory figures do not mix. The inputs
+are synthetic CVs, sent the way the bot sends them: summaries with the final
+summary arguments of ai/ai_feedback.py and skill extraction prompts built by
+ai/prompts.py. The ``onnx`` backend needs ``optimum[onnxruntime]``; its first
+run includes the export.
+
+Usage: python -m bench.bench_backends [--models summarizer,chat] [--backends torch,int8,onnx] [--samples N]
+"""
+import argparse
+import difflib
+import multiprocessing
+import os
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from ai.ai_feedback import FINAL_SUMMARY_KWARGS
+from ai.backends import BACKENDS, build_pipeline
+from ai.models import MODEL_SPECS, _current_rss
+from bench.synthetic import make_cv_text
+
+CHAT_KWARGS = dict(max_new_tokens=60, do_sample=False)
+
+
+def _inputs(model_name: str, samples: int) -> List[str]:
+    texts = [make_cv_text(jobs=2 + i % 4, seed=i) for i in range(samples)]
+    if model_name == "chat":
+        from ai.prompts import build_skills_prompt
+
+        return [build_skills_prompt(text, CHAT_KWARGS["max_new_tokens"]) for text in texts]
+    return texts
+
+
+def _run_backend(model_name: str, backend: str, samples: int) -> Dict:
+    # Runs in a fresh process
+    task, model_id = MODEL_SPECS[model_name]
+    inputs = _inputs(model_name, samples)
+    rss_before = _current_rss()
+    start = time.perf_counter()
+    pipe = build_pipeline(task, model_id, backend)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = _current_rss()
+
+    outputs, latencies = [], []
+    for text in inputs:
+        start = time.perf_counter()
+        if model_name == "chat":
+            out = pipe(text, **CHAT_KWARGS)[0]["generated_text"][len(text):]
+        else:
+            out = pipe(text, **FINAL_SUMMARY_KWARGS)[0]["summary_text"]
+        latencies.append(time.perf_counter() - start)
+        outputs.append(out.strip())
+    return {
+        "load_seconds": load_seconds,
+        "model_mib": (rss_loaded - rss_before) / 2**20,
+        "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latencies": latencies,
+        "outputs": outputs,
+    }
+
+
+def _agreement(reference: List[str], outputs: List[str]) -> tuple:
+    exact = sum(a == b for a, b in zip(reference, outputs)) / len(reference)
+    similarity = statistics.mean(
+        difflib.SequenceMatcher(None, a.split(), b.split()).ratio() for a, b in zip(reference, outputs)
+    )
+    return exact, similarity
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", default=",".join(MODEL_SPECS))
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--samples", type=int, default=8)
+    args = parser.parse_args()
+
+    backends = [b for b in args.backends.split(",") if b]
+    if "torch" not in backends:
+        backends.insert(0, "torch")  # the reference for agreement
+    print(
+        f"threads: intra-op {os.environ.get('CVBOT_INTRA_OP_THREADS', 'default')}, "
+        f"inter-op {os.environ.get('CVBOT_INTER_OP_THREADS', 'default')}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for model_name in [m for m in args.models.split(",") if m]:
+        print(f"\n{model_name} ({MODEL_SPECS[model_name][1]}), {args.samples} samples")
+        print(f"{'backend':<8}{'load s':>9}{'model MiB':>11}{'peak MiB':>10}{'p50 s':>8}{'p95 s':>8}{'exact':>7}{'similar':>9}")
+        reference = None
+        for backend in backends:
+            try:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(_run_backend, model_name, backend, args.samples).result()
+            except Exception as e:
+                print(f"{backend:<8}failed: {e}")
+                continue
+            if backend == "torch":
+                reference = result["outputs"]
+            exact, similar = _agreement(reference, result["outputs"]) if reference else (float("nan"),) * 2
+            print(
+                f"{backend:<8}{result['load_seconds']:>9.1f}{result['model_mib']:>11.0f}{result['peak_mib']:>10.0f}"
+                f"{_percentile(result['latencies'], 50):>8.2f}{_percentile(result['latencies'], 95):>8.2f}"
+                f"{exact:>7.0%}{similar:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark job page extraction: the old nested find_all scan against
+utils.job_extract, on the saved pages in bench/corpus/job_pages.
+
+Each page is also inflated into a large job board page (deep nesting and
+hundreds of related-job cards) to show how both scale.
+
+Usage: python -m bench.bench_job_extract [--repeat N]
+"""
+import argparse
+import json
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.job_extract import HTML_PARSER, extract_by_density, extract_job_description
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus", "job_pages")
+
+
+def legacy_extract(html: str) -> str:
+    # The extractor previously used by !cvmatch and !interviewprep
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in ['section', 'div', 'article']:
+        for elem in soup.find_all(tag):
+            text = elem.get_text(separator=' ', strip=True)
+            if len(text) > 200:
+                return text
+    return soup.get_text(separator=' ', strip=True)
+
+
+def inflate(html: str, depth: int = 60, cards: int = 400) -> str:
+    card = (
+        '<div class="card"><a href="/job/{0}"><div class="card-body">Related job {0}'
+        '<span>Somewhere, full time, posted {0} days ago</span></div></a></div>'
+    )
+    related = "".join(card.format(i) for i in range(cards))
+    body_start = html.lower().find("<body")
+    body_start = html.find(">", body_start) + 1
+    body_end = html.lower().rfind("</body>")
+    inner = html[body_start:body_end]
+    nested = "<div>" * depth + inner + "</div>" * depth
+    return html[:body_start] + f'<div class="results">{related}</div>' + nested + html[body_end:]
+
+
+def timed(func, html: str, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = func(html)
+    return (time.perf_counter() - start) / repeat, text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(os.path.join(CORPUS_DIR, "expected.json")) as f:
+        expected = json.load(f)
+
+    extractors = [
+        ("legacy", legacy_extract),
+        ("density", extract_by_density),
+        ("density/html.parser", lambda html: extract_by_density(html, parser="html.parser")),
+        ("full", extract_job_description),
+    ]
+    print(f"HTML parser: {HTML_PARSER}")
+    print(f"{'page':<36}{'extractor':<22}{'ms':>10}  correct")
+    totals = {name: [0.0, 0, 0] for name, _ in extractors}
+    for filename, check in sorted(expected.items()):
+        with open(os.path.join(CORPUS_DIR, filename), encoding="utf-8") as f:
+            html = f.read()
+        for label, page in ((filename, html), (filename + " (inflated)", inflate(html))):
+            for name, func in extractors:
+                seconds, text = timed(func, page, args.repeat)
+                correct = check["contains"] in text and check["excludes"] not in text
+                totals[name][0] += seconds
+                totals[name][1] += correct
+                totals[name][2] += 1
+                print(f"{label:<36}{name:<22}{seconds * 1000:>10.2f}  {'yes' if correct else 'no'}")
+    print()
+    for name, (seconds, correct, count) in totals.items():
+        print(f"{name:<22} total {seconds * 1000:8.1f} ms   accuracy {correct}/{count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark for CV text extraction: the previous serial pdfplumber loop against
+utils.cv_processor (pdfplumber only, and the pypdfium2 fast path, both with
+the MAX_TEXT_CHARS budget) and the full upload path in utils.uploads, which
+splits long documents across the PDF worker pool.
+
+The PDFs are synthetic CVs from one page to a 60-page portfolio; the page
+limit is lifted for the run so the budget, not the rejection, is measured.
+
+Usage: python -m bench.bench_pdf_extract [--repeat N] [--pages 1,3,10,20,60]
+"""
+import argparse
+import asyncio
+import io
+import textwrap
+import time
+
+import pdfplumber
+
+from bench.synthetic import LINES_PER_PAGE, make_cv_pdf, make_cv_text
+from utils import cv_processor, uploads
+from utils.executors import shutdown_pools
+
+
+def legacy_extract(data: bytes) -> str:
+    # extract_text_from_pdf as it was: every page, layout analysis, string concatenation
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text(x_tolerance=1, y_tolerance=1)
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def plumber_extract(data: bytes) -> str:
+    engine = cv_processor.PDF_ENGINE
+    cv_processor.PDF_ENGINE = "pdfplumber"
+    try:
+        return cv_processor.extract_text_from_pdf(data, max_chars=uploads.MAX_TEXT_CHARS)
+    finally:
+        cv_processor.PDF_ENGINE = engine
+
+
+def fast_extract(data: bytes) -> str:
+    return cv_processor.extract_text_from_pdf(data, max_chars=uploads.MAX_TEXT_CHARS)
+
+
+def _jobs_for_pages(pages: int) -> int:
+    # Grow the synthetic CV until it renders to the wanted number of pages
+    jobs = 1
+    while sum(len(textwrap.wrap(line, 95)) or 1 for line in make_cv_text(jobs=jobs).splitlines()) \
+            <= (pages - 1) * LINES_PER_PAGE:
+        jobs += 1
+    return jobs
+
+
+def timed(func, data: bytes, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = func(data)
+    return (time.perf_counter() - start) / repeat * 1000, text
+
+
+async def timed_upload_path(data: bytes, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = await uploads._extract_pages(data)
+    return (time.perf_counter() - start) / repeat * 1000, text
+
+
+def _same_words(reference: str, text: str) -> str:
+    # The budget may cut the last word
+    words = text.split()[:-1]
+    return "yes" if reference.split()[:len(words)] == words else "no"
+
+
+async def run(args: argparse.Namespace) -> None:
+    uploads.MAX_PAGES = 10**6
+    candidates = [("legacy", legacy_extract), ("pdfplumber+budget", plumber_extract)]
+    if cv_processor.pypdfium2 is not None:
+        candidates.append(("pdfium+budget", fast_extract))
+    else:
+        print("pypdfium2 is not installed; the fast path is not measured.")
+
+    print("Rendering PDFs...")
+    pdfs = [(pages, make_cv_pdf(jobs=_jobs_for_pages(pages), seed=pages)) for pages in args.pages]
+    # Start the PDF workers before timing
+    await uploads._extract_pages(pdfs[0][1])
+
+    header = f"{'pages':>6}{'chars':>8}" + "".join(f"{name:>20}" for name, _ in candidates)
+    print(header + f"{'upload path':>16}{'same text':>14}")
+    for _, data in pdfs:
+        legacy_ms, reference = timed(legacy_extract, data, args.repeat)
+        row = f"{cv_processor.count_pages(data):>6}{len(reference):>8}{legacy_ms:>17.1f} ms"
+        same = []
+        for name, func in candidates[1:]:
+            ms, text = timed(func, data, args.repeat)
+            row += f"{ms:>17.1f} ms"
+            same.append(_same_words(reference, text))
+        ms, text = await timed_upload_path(data, args.repeat)
+        same.append(_same_words(reference, text))
+        print(row + f"{ms:>13.1f} ms{'/'.join(same):>14}")
+    print(f"\nBudget: {uploads.MAX_TEXT_CHARS} characters; upload path uses {uploads.PAGES_PER_TASK} pages "
+          f"per task over the idle PDF workers.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pages", type=lambda s: [int(p) for p in s.split(",")], default=[1, 3, 10, 20, 60])
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for the CV text analysis used by score_cv, !cvformatcheck and
+extract_contact_info: the previous per-keyword scans against the shared
+utils.text_analyzer.
+
+Grammar checking is not included; it is benchmarked separately by nature.
+
+Usage: python -m bench.bench_text_analyzer [--repeat N]
+"""
+import argparse
+import re
+import time
+
+from bench.synthetic import make_cv_text
+from utils import text_analyzer
+
+SECTION_KEYWORDS = text_analyzer.SECTION_KEYWORDS
+
+
+def legacy_analysis(cv_text: str) -> None:
+    # score_cv without grammar checking, as it was before the analyzer
+    text = cv_text.lower()
+    for keywords in SECTION_KEYWORDS.values():
+        any(keyword in text for keyword in keywords)
+    re.search(r'\b\w+@\w+\.\w+\b', text)
+    re.search(r'\b\d{10,}\b', text)
+    'linkedin.com' in text
+    any(word in text for word in ['summary', 'objective', 'profile'])
+    any(word in text for word in ['achievement', 'award', 'honor', 'certification'])
+    any(bullet in text for bullet in ['•', '- ', '* '])
+    # !cvformatcheck
+    len(cv_text.split())
+    any(b in cv_text for b in ['•', '-', '*'])
+    text = cv_text.lower()
+    for keywords in SECTION_KEYWORDS.values():
+        any(keyword in text for keyword in keywords)
+    # extract_contact_info
+    re.search(r'\b[\w.-]+@[\w.-]+\.\w+\b', cv_text)
+    re.search(r'\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{2,4}\)?[\s-]?)?\d{3,4}[\s-]?\d{3,4}\b', cv_text)
+    re.search(r'(https?://)?(www\.)?linkedin\.com/in/[A-Za-z0-9_-]+', cv_text)
+
+
+def timed(func, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    candidates = [
+        ("legacy scans", legacy_analysis),
+        ("analyzer", text_analyzer.analyze_cv.__wrapped__),
+    ]
+
+    print(f"{'CV size':<20}" + "".join(f"{name:>26}" for name, _ in candidates))
+    for jobs in (2, 8, 40):
+        text = make_cv_text(jobs=jobs)
+        row = f"{len(text):>6} chars        "
+        for _, func in candidates:
+            row += f"{timed(func, text, args.repeat):>23.1f} us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
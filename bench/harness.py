@@ -0,0 +1,160 @@
+"""
+Local stand-ins for the parts of discord.py the commands use, so command
+handlers can be run and timed without a Discord server.
+
+A ScriptedBot registers the real commands (through their setup functions) and
+answers ``wait_for('message', ...)`` from per-user scripts of replies and
+attachments. A FakeContext records everything the command sends.
+
+    bot = ScriptedBot()
+    setup_cvformatcheck(bot)
+    ctx = bot.session(user_id=1, guild_id=1, replies=[FakeMessage(attachments=[FakeAttachment("cv.pdf", data)])])
+    await bot.run_command("cvformatcheck", ctx)
+"""
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import discord
+from discord.ext import commands
+
+from utils import metrics, scheduler
+
+_ids = itertools.count(1)
+
+
+@dataclass(eq=False)
+class FakeUser:
+    id: int
+    name: str = "user"
+
+
+@dataclass(eq=False)
+class FakeGuild:
+    id: int
+
+
+@dataclass(eq=False)
+class FakeChannel:
+    id: int
+
+
+class FakeAttachment:
+    def __init__(self, filename: str, data: bytes):
+        self.filename = filename
+        self.size = len(data)
+        self._data = data
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+@dataclass(eq=False)
+class FakeMessage:
+    content: str = ""
+    attachments: List[FakeAttachment] = field(default_factory=list)
+    author: Optional[FakeUser] = None
+    channel: Optional[FakeChannel] = None
+    id: int = field(default_factory=lambda: next(_ids))
+
+    async def edit(self, content: Optional[str] = None, **kwargs) -> None:
+        self.content = content
+
+
+@dataclass
+class Sent:
+    at: float
+    content: Optional[str]
+    file: Any = None
+
+
+class FakeContext:
+    """
+    Stands in for commands.Context: records sends with their time since the
+    session started.
+    """
+
+    def __init__(self, bot: "ScriptedBot", author: FakeUser, guild: Optional[FakeGuild], channel: FakeChannel,
+                 message: FakeMessage):
+        self.bot = bot
+        self.author = author
+        self.guild = guild
+        self.channel = channel
+        self.message = message
+        self.sent: List[Sent] = []
+        self.started_at = time.perf_counter()
+
+    async def send(self, content: Optional[str] = None, *, file: Any = None, **kwargs) -> FakeMessage:
+        with metrics.span("send"):
+            self.sent.append(Sent(time.perf_counter() - self.started_at, content, file))
+            return FakeMessage(content=content or "", author=None, channel=self.channel)
+
+    def first_send_after(self, prefix: str) -> Optional[float]:
+        """
+        Seconds until the first message starting with ``prefix`` was sent, if any.
+        """
+        return next((s.at for s in self.sent if s.content and s.content.startswith(prefix)), None)
+
+
+class ScriptedBot(commands.Bot):
+    """
+    A commands.Bot that is never connected. ``wait_for('message')`` returns
+    the first scripted reply (of any session) that passes the check; when no
+    scripted reply matches, the user is treated as gone and the wait times out.
+    """
+
+    def __init__(self, reply_delay: float = 0.0):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        super().__init__(command_prefix="!", intents=intents)
+        self.reply_delay = reply_delay
+        self._inbox: List[FakeMessage] = []
+        self.timeouts = 0
+
+    def session(self, user_id: int, guild_id: Optional[int], replies: List[FakeMessage],
+                attachments: Optional[List[FakeAttachment]] = None) -> FakeContext:
+        """
+        Create the context of one simulated user and queue their scripted replies.
+        """
+        author = FakeUser(user_id, f"user{user_id}")
+        channel = FakeChannel(user_id)
+        for reply in replies:
+            reply.author, reply.channel = author, channel
+            self._inbox.append(reply)
+        message = FakeMessage(attachments=list(attachments or []), author=author, channel=channel)
+        guild = FakeGuild(guild_id) if guild_id is not None else None
+        return FakeContext(self, author, guild, channel, message)
+
+    def end_session(self, ctx: FakeContext) -> None:
+        # Drop replies the command never asked for
+        self._inbox = [m for m in self._inbox if m.author is not ctx.author]
+
+    async def wait_for(self, event, /, *, check=None, timeout=None):
+        """
+        Return the first scripted reply that passes ``check``. Only 'message'
+        events are scripted, the only event the commands wait on; any other
+        event raises ValueError so a command that starts waiting for one
+        fails loudly instead of timing out.
+        """
+        if event != "message":
+            raise ValueError(f"ScriptedBot only scripts 'message' events, not {event!r}")
+        if self.reply_delay:
+            await asyncio.sleep(self.reply_delay)
+        for message in self._inbox:
+            if check is None or check(message):
+                self._inbox.remove(message)
+                return message
+        self.timeouts += 1
+        metrics.TIMEOUTS.inc(command=metrics.current_command(), event=event)
+        raise asyncio.TimeoutError()
+
+    async def run_command(self, name: str, ctx: FakeContext, **kwargs) -> None:
+        """
+        Invoke a registered command the way the bot's before_invoke hook would
+        set it up, skipping checks and cooldowns.
+        """
+        scheduler.bind(ctx.guild.id if ctx.guild else None, ctx.author.id, ctx.send)
+        metrics.bind_command(name)
+        await self.get_command(name).callback(ctx, **kwargs)
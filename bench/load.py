@@ -0,0 +1,258 @@
+"""
+Load driver for the bot's commands: runs N concurrent simulated users per
+command against the real command handlers (bench/harness.py) and reports
+throughput, p50/p95/p99 latency and peak RSS per command.
+
+Models and LanguageTool are replaced by the tiny stubs in bench/stubs.py
+unless --real-models is given, so the suite runs on a CPU-only CI machine.
+CVs are synthetic PDFs of varying length (bench/synthetic.py); job
+descriptions come from bench/corpus/job_descriptions, and with --url-share
+some are served as job pages from bench/corpus/job_pages by a local HTTP
+server. Caches and the candidate index live in a temporary directory.
+
+Usage: python -m bench.load [--commands reviewcv,cvmatch,...] [--users N] [--rounds N] [--real-models] [--json out.json]
+"""
+import os
+import tempfile
+
+# Before the bot's modules read their configuration
+if "CVBOT_CACHE_DIR" not in os.environ:
+    _tmp = tempfile.mkdtemp(prefix="cvbot-bench-")
+    os.environ["CVBOT_CACHE_DIR"] = os.path.join(_tmp, "cache")
+    os.environ["CVBOT_DATA_DIR"] = os.path.join(_tmp, "data")
+os.environ.setdefault("CVBOT_MODEL_IDLE_TIMEOUT", "0")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import multiprocessing  # noqa: E402
+import random  # noqa: E402
+import time  # noqa: E402
+from typing import Dict, List  # noqa: E402
+
+from aiohttp import web  # noqa: E402
+
+from ai.models import _current_rss  # noqa: E402
+from bench.harness import FakeAttachment, FakeMessage, ScriptedBot  # noqa: E402
+from bench.synthetic import make_cv_pdf  # noqa: E402
+from commands.cvformatcheck import setup as setup_cvformatcheck  # noqa: E402
+from commands.cvmatch import setup as setup_cvmatch  # noqa: E402
+from commands.extractinfo import setup as setup_extractinfo  # noqa: E402
+from commands.fullreport import setup as setup_fullreport  # noqa: E402
+from commands.interviewprep import setup as setup_interviewprep  # noqa: E402
+from commands.rankcvs import setup as setup_rankcvs  # noqa: E402
+from commands.reviewcv import setup as setup_reviewcv  # noqa: E402
+from commands.searchcandidates import setup as setup_searchcandidates  # noqa: E402
+from utils.executors import shutdown_pools  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+# searchcandidates last: it needs the candidates indexed by cvmatch and rankcvs
+COMMANDS = [
+    "cvformatcheck", "extractinfo", "reviewcv", "fullreport", "cvmatch", "interviewprep", "rankcvs", "searchcandidates",
+]
+SETUPS = [
+    setup_cvformatcheck, setup_extractinfo, setup_reviewcv, setup_fullreport, setup_cvmatch,
+    setup_interviewprep, setup_rankcvs, setup_searchcandidates,
+]
+CV_LENGTHS = (2, 4, 8, 16, 30)  # jobs per synthetic CV: one to five pages
+RANKCVS_FILES = 5
+INTERVIEW_ANSWERS = 6
+
+
+def _tree_rss() -> int:
+    # This process plus the PDF worker processes
+    total = _current_rss()
+    for child in multiprocessing.active_children():
+        try:
+            with open(f"/proc/{child.pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+class JobSource:
+    """
+    Job inputs: pasted descriptions, or URLs of saved job pages on a local server.
+    """
+
+    def __init__(self, url_share: float, seed: int):
+        folder = os.path.join(CORPUS_DIR, "job_descriptions")
+        self.texts = [open(os.path.join(folder, name), encoding="utf-8").read() for name in sorted(os.listdir(folder))]
+        self.pages = sorted(n for n in os.listdir(os.path.join(CORPUS_DIR, "job_pages")) if n.endswith(".html"))
+        self.url_share = url_share
+        self.rng = random.Random(seed)
+        self.base_url = None
+        self._runner = None
+
+    async def start(self) -> None:
+        if not self.url_share:
+            return
+        app = web.Application()
+        app.router.add_static("/jobs/", os.path.join(CORPUS_DIR, "job_pages"))
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/jobs/"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def next(self) -> str:
+        if self.base_url and self.rng.random() < self.url_share:
+            return self.base_url + self.rng.choice(self.pages)
+        return self.rng.choice(self.texts)
+
+
+class CVSource:
+    """
+    Synthetic CV PDFs, rendered before timing starts. With ``distinct`` set
+    to a small number, CVs repeat and the caches get hits.
+    """
+
+    def __init__(self, distinct: int):
+        self.pdfs = [
+            (f"cv_{i}.pdf", make_cv_pdf(jobs=CV_LENGTHS[i % len(CV_LENGTHS)], seed=i)) for i in range(distinct)
+        ]
+        self._next = 0
+
+    def next(self) -> FakeAttachment:
+        name, data = self.pdfs[self._next % len(self.pdfs)]
+        self._next += 1
+        return FakeAttachment(name, data)
+
+
+def _script(command: str, jobs: JobSource, cvs: CVSource) -> tuple:
+    """
+    Return (replies, attachments on the command message, command kwargs) for one session.
+    """
+    pdf = lambda: FakeMessage(attachments=[cvs.next()])  # noqa: E731
+    if command in ("cvformatcheck", "extractinfo", "reviewcv", "fullreport"):
+        return [pdf()], [], {}
+    if command == "cvmatch":
+        return [FakeMessage(jobs.next()), pdf()], [], {}
+    if command == "interviewprep":
+        replies = [FakeMessage(jobs.next()), pdf(), FakeMessage("yes")]
+        for i in range(INTERVIEW_ANSWERS):
+            replies += [FakeMessage(f"My answer to question {i + 1} draws on my experience."), FakeMessage("yes")]
+        return replies, [], {}
+    if command == "rankcvs":
+        return [], [cvs.next() for _ in range(RANKCVS_FILES)], {"job_input": jobs.next()}
+    if command == "searchcandidates":
+        return [], [], {"job_input": jobs.next()}
+    raise ValueError(f"Unknown command: {command}")
+
+
+async def run_command_load(bot: ScriptedBot, command: str, users: int, rounds: int, guilds: int,
+                           jobs: JobSource, cvs: CVSource) -> Dict:
+    latencies, errors = [], 0
+    peak = _tree_rss()
+    timeouts_before = bot.timeouts
+
+    async def user(user_id: int) -> None:
+        nonlocal errors
+        for _ in range(rounds):
+            replies, attachments, kwargs = _script(command, jobs, cvs)
+            ctx = bot.session(user_id, user_id % guilds, replies, attachments)
+            start = time.perf_counter()
+            try:
+                await bot.run_command(command, ctx, **kwargs)
+            except Exception:
+                errors += 1
+                logging.exception("Simulated %s session failed.", command)
+            latencies.append(time.perf_counter() - start)
+            bot.end_session(ctx)
+
+    async def sample_rss() -> None:
+        nonlocal peak
+        while True:
+            peak = max(peak, _tree_rss())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_rss())
+    start = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(1, users + 1)))
+    wall = time.perf_counter() - start
+    sampler.cancel()
+    return {
+        "sessions": len(latencies),
+        "errors": errors,
+        "timeouts": bot.timeouts - timeouts_before,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "peak_rss_mib": peak / 2**20,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    if not args.real_models:
+        from bench import stubs
+
+        stubs.install()
+    bot = ScriptedBot(reply_delay=args.reply_delay)
+    for setup in SETUPS:
+        setup(bot)
+    jobs = JobSource(args.url_share, args.seed)
+    await jobs.start()
+    print(f"Rendering {args.distinct_cvs} synthetic CV PDFs...")
+    cvs = CVSource(args.distinct_cvs)
+
+    results = {}
+    print(f"{args.users} users x {args.rounds} rounds per command, {args.guilds} guilds, "
+          f"{'real models' if args.real_models else 'stub models'}\n")
+    print(f"{'command':<18}{'sessions':>9}{'errors':>8}{'timeouts':>9}{'per s':>8}"
+          f"{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'peak MiB':>10}")
+    try:
+        for command in [c for c in COMMANDS if c in args.commands.split(",")]:
+            r = await run_command_load(bot, command, args.users, args.rounds, args.guilds, jobs, cvs)
+            results[command] = r
+            print(f"{command:<18}{r['sessions']:>9}{r['errors']:>8}{r['timeouts']:>9}{r['throughput']:>8.2f}"
+                  f"{r['p50']:>8.2f}{r['p95']:>8.2f}{r['p99']:>8.2f}{r['peak_rss_mib']:>10.0f}")
+    finally:
+        await jobs.stop()
+        from utils.job_fetch import close_session
+
+        await close_session()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", default=",".join(COMMANDS))
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated users per command")
+    parser.add_argument("--rounds", type=int, default=2, help="sessions per user")
+    parser.add_argument("--guilds", type=int, default=2)
+    parser.add_argument("--distinct-cvs", type=int, default=20, help="fewer than sessions means cache hits")
+    parser.add_argument("--url-share", type=float, default=0.3, help="share of job inputs given as URLs")
+    parser.add_argument("--reply-delay", type=float, default=0.0, help="seconds a user takes to reply")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--real-models", action="store_true", help="use the configured models instead of stubs")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_pools()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
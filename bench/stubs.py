@@ -0,0 +1,151 @@
+"""
+Tiny stand-ins for the models and LanguageTool, so the command benchmarks run
+on a CPU-only CI machine without downloading weights or starting Java.
+
+The stubs take the registry's place (ai.models, utils.grammar) rather than
+patching the commands, so batching, caching, scheduling, prompt packing and
+streaming all run as in production. Each stub sleeps in proportion to its
+input/output size to keep queues and worker pools realistically busy.
+"""
+import time
+from dataclasses import dataclass
+from typing import List
+
+from ai import models, streaming
+from utils import grammar
+
+# Seconds per generated token / per input token for the stubs
+GENERATE_SECONDS_PER_TOKEN = 0.002
+READ_SECONDS_PER_TOKEN = 0.00002
+
+SKILLS_COMPLETION = " Python, SQL, Docker, Kubernetes, AWS, Communication"
+QUESTIONS_COMPLETION = (
+    " 1. Can you describe a project where you used Python in production?\n"
+    "2. How have you used Docker and Kubernetes to deploy services?\n"
+    "3. How do you approach tuning a slow SQL query?\n"
+    "4. Tell me about a time you disagreed with a design decision.\n"
+)
+
+
+class StubTokenizer:
+    """
+    Whitespace tokenizer with the subset of the transformers API the bot uses.
+    """
+    eos_token = "</s>"
+    eos_token_id = 2
+    pad_token_id = None
+    padding_side = "right"
+    model_max_length = 2048
+
+    def __init__(self):
+        self._vocab = {}
+        self._words = []
+
+    @property
+    def pad_token(self):
+        return self.eos_token if self.pad_token_id is not None else None
+
+    @pad_token.setter
+    def pad_token(self, value) -> None:
+        self.pad_token_id = self.eos_token_id
+
+    def _encode(self, text: str) -> List[int]:
+        ids = []
+        for word in text.split():
+            if word not in self._vocab:
+                self._vocab[word] = len(self._words)
+                self._words.append(word)
+            ids.append(self._vocab[word])
+        return ids
+
+    def __call__(self, text, add_special_tokens: bool = True, **kwargs) -> dict:
+        if isinstance(text, list):
+            return {"input_ids": [self._encode(t) for t in text]}
+        return {"input_ids": self._encode(text)}
+
+    def decode(self, ids: List[int], skip_special_tokens: bool = True) -> str:
+        return " ".join(self._words[i] for i in ids)
+
+
+def _completion(prompt: str) -> str:
+    return QUESTIONS_COMPLETION if prompt.rstrip().endswith("Interview Questions:") else SKILLS_COMPLETION
+
+
+def _work(tokenizer: StubTokenizer, inputs: List[str], output_tokens: int) -> None:
+    read = sum(len(tokenizer(text)["input_ids"]) for text in inputs)
+    time.sleep(read * READ_SECONDS_PER_TOKEN + output_tokens * GENERATE_SECONDS_PER_TOKEN)
+
+
+class StubTextGeneration:
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+
+    def __call__(self, prompts, batch_size: int = 1, max_new_tokens: int = 60, **kwargs):
+        single = isinstance(prompts, str)
+        prompts = [prompts] if single else prompts
+        completions = [_completion(p) for p in prompts]
+        # A batch decodes its sequences in lockstep: time goes by the longest
+        longest = max(len(c.split()) for c in completions)
+        _work(self.tokenizer, prompts, min(longest, max_new_tokens))
+        outputs = [[{"generated_text": p + c}] for p, c in zip(prompts, completions)]
+        return outputs[0] if single else outputs
+
+
+class StubSummarization:
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+
+    def __call__(self, texts, batch_size: int = 1, max_length: int = 150, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        outputs = []
+        for text in texts:
+            lines = [line for line in text.splitlines() if line.strip()]
+            outputs.append({"summary_text": " ".join(lines[:3])[:max_length * 5]})
+        _work(self.tokenizer, texts, max_length // 2)
+        # Like the pipeline: a list of results for a single text as well
+        return outputs
+
+
+def _stub_stream_worker(model_name, prompt, gen_kwargs, emit, stop) -> None:
+    # Same contract as ai.streaming._stream_worker: emit text pieces until done or stopped
+    for word in _completion(prompt).split(" "):
+        if stop.is_set():
+            return
+        time.sleep(GENERATE_SECONDS_PER_TOKEN)
+        emit(word + " ")
+
+
+@dataclass
+class StubMatch:
+    offset: int
+
+
+class StubLanguageTool:
+    """
+    Reports one issue per sentence containing a doubled word.
+    """
+
+    def check(self, text: str) -> List[StubMatch]:
+        time.sleep(len(text) * 1e-6)
+        matches = []
+        words = text.split(" ")
+        offset = 0
+        for previous, word in zip([""] + words, words):
+            if word and word.lower() == previous.lower():
+                matches.append(StubMatch(offset))
+            offset += len(word) + 1
+        return matches
+
+    def close(self) -> None:
+        pass
+
+
+def install() -> None:
+    """
+    Put the stubs in place of the real models and LanguageTool for this process.
+    """
+    for name, stub in (("chat", StubTextGeneration()), ("summarizer", StubSummarization())):
+        models._models[name] = stub
+        models._stats.setdefault(name, {"loads": 0, "model_id": "stub"})
+    streaming._stream_worker = _stub_stream_worker
+    grammar._tool = StubLanguageTool()
@@ -0,0 +1,86 @@
+"""
+Synthetic CV text and PDFs used by the benchmarks.
+"""
+import io
+import random
+import textwrap
+
+_FIRST = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Robin", "Charlie"]
+_LAST = ["Martin", "Garcia", "Nguyen", "Schmidt", "Rossi", "Dubois", "Kowalski", "Silva"]
+_SKILLS = [
+    "Python", "SQL", "Docker", "Kubernetes", "React", "TypeScript", "AWS", "Terraform",
+    "PostgreSQL", "Redis", "Django", "FastAPI", "Pandas", "PyTorch", "Git", "Linux",
+]
+_VERBS = ["Built", "Designed", "Led", "Maintained", "Migrated", "Automated", "Improved", "Shipped"]
+_OBJECTS = [
+    "a data pipeline processing 2M events per day",
+    "the internal billing service used by 40 teams",
+    "CI/CD for a monorepo with 300 services",
+    "a customer-facing dashboard in React",
+    "the search ranking model and its evaluation suite",
+    "on-call tooling that cut incident response time by half",
+]
+
+
+def make_cv_text(jobs: int = 3, seed: int = 0) -> str:
+    """
+    Return plain CV text with contact details, summary, experience,
+    education and skills. ``jobs`` controls the length.
+    """
+    rng = random.Random(seed)
+    first, last = rng.choice(_FIRST), rng.choice(_LAST)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}@example.com | +1 555-123-4567 | linkedin.com/in/{first.lower()}{last.lower()}",
+        "",
+        "Summary",
+        f"Software engineer with {jobs + 2} years of experience building backend systems and data products.",
+        "",
+        "Professional Experience",
+    ]
+    for i in range(jobs):
+        lines.append(f"Software Engineer, Company {i + 1} ({2024 - 2 * i - 2} - {2024 - 2 * i})")
+        for _ in range(4):
+            lines.append(f"• {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {rng.choice(_SKILLS)} and {rng.choice(_SKILLS)}.")
+        lines.append("")
+    lines += [
+        "Education",
+        "MSc Computer Science, University of Lyon (2016 - 2018)",
+        "",
+        "Skills",
+        ", ".join(rng.sample(_SKILLS, 8)),
+        "",
+        "Certifications",
+        "AWS Certified Developer - Associate",
+    ]
+    return "\n".join(lines)
+
+
+LINES_PER_PAGE = 48
+
+
+def make_cv_pdf(jobs: int = 3, seed: int = 0) -> bytes:
+    """
+    Render make_cv_text(jobs, seed) as an A4 PDF with a text layer, one page
+    per LINES_PER_PAGE lines, using matplotlib.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    # TrueType fonts keep the text extractable (the Type 3 default is not always)
+    matplotlib.rcParams["pdf.fonttype"] = 42
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    lines = []
+    for line in make_cv_text(jobs=jobs, seed=seed).splitlines():
+        lines.extend(textwrap.wrap(line, 95) or [""])
+
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        for start in range(0, len(lines), LINES_PER_PAGE):
+            fig = Figure(figsize=(8.27, 11.69))
+            for i, line in enumerate(lines[start:start + LINES_PER_PAGE]):
+                fig.text(0.07, 0.95 - i * 0.0188, line, fontsize=9, family="DejaVu Sans")
+            pdf.savefig(fig)
+    return buffer.getvalue()
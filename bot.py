@@ -1,32 +1,210 @@
+import time
+
+# Time-to-online is measured from here
+STARTED_AT = time.perf_counter()
+
 import discord
 from discord.ext import commands
 from config import DISCORD_TOKEN
 
-from commands.reviewcv import setup as setup_reviewcv
-from utils.scoring import score_cv
-from commands.extractinfo import setup as setup_extractinfo
 from commands.help import setup as setup_help
-from commands.cvformatcheck import setup as setup_cvformatcheck
-from commands.cvmatch import setup as setup_cvmatch
-from commands.interviewprep import setup as setup_interviewprep
 
+import asyncio
+import importlib
 import logging
+import os
+from ai import remote
+from ai.models import is_loaded, warm_up
+from utils import metrics, scheduler
+from utils.logs import configure_logging
+
+# Command name -> module whose setup() registers it. The modules (and the PDF,
+# HTML and NumPy libraries they pull in) are imported after the bot is online.
+COMMAND_MODULES = {
+    "reviewcv": "commands.reviewcv",
+    "extractinfo": "commands.extractinfo",
+    "cvformatcheck": "commands.cvformatcheck",
+    "cvmatch": "commands.cvmatch",
+    "interviewprep": "commands.interviewprep",
+    "rankcvs": "commands.rankcvs",
+    "searchcandidates": "commands.searchcandidates",
+    "fullreport": "commands.fullreport",
+}
+# Models a command needs; users are told when these are still loading
+COMMAND_MODELS = {
+    "reviewcv": ["summarizer"],
+    "fullreport": ["summarizer"],
+    "cvmatch": ["chat"],
+    "interviewprep": ["chat"],
+    "rankcvs": ["chat"],
+    "searchcandidates": ["chat"],
+}
+# CVBOT_LAZY_COMMANDS=0 registers every command before connecting, as before
+LAZY_COMMANDS = os.environ.get("CVBOT_LAZY_COMMANDS", "1") != "0"
+
+_startup: dict = {}
+# Commands still served by their warming-up stub
+_warming_up = set(COMMAND_MODULES) if LAZY_COMMANDS else set()
+
+
+class TimedContext(commands.Context):
+    started_at: float = 0.0
+    profiler = None
+
+    async def send(self, *args, **kwargs):
+        with metrics.span("send"):
+            return await super().send(*args, **kwargs)
+
+
+class InstrumentedBot:
+    """
+    Mixin that times Discord sends, counts reply timeouts and serves /metrics.
+    """
+
+    async def setup_hook(self) -> None:
+        await metrics.start_server()
+        if LAZY_COMMANDS:
+            # Runs while the gateway connection is being set up
+            self.loading_commands = asyncio.create_task(load_commands(self))
+
+    async def get_context(self, origin, /, *, cls=TimedContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def wait_for(self, event, /, *, check=None, timeout=None):
+        try:
+            return await super().wait_for(event, check=check, timeout=timeout)
+        except asyncio.TimeoutError:
+            metrics.TIMEOUTS.inc(command=metrics.current_command(), event=event)
+            raise
+
+
+class CVBot(InstrumentedBot, commands.Bot):
+    pass
+
+
+class ShardedCVBot(InstrumentedBot, commands.AutoShardedBot):
+    pass
 
-logging.basicConfig(
-    filename='logs/bot.log',
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s:%(name)s: %(message)s'
-)
 
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Sharding: CVBOT_SHARD_COUNT=auto lets discord.py pick the shard count; to
+# split shards over several front-end processes, give each one the total
+# count and its own CVBOT_SHARD_IDS, e.g. CVBOT_SHARD_COUNT=4 CVBOT_SHARD_IDS=0,1
+shard_count = os.environ.get("CVBOT_SHARD_COUNT", "")
+shard_ids = os.environ.get("CVBOT_SHARD_IDS", "")
+if shard_count:
+    bot = ShardedCVBot(
+        command_prefix="!",
+        intents=intents,
+        shard_count=None if shard_count == "auto" else int(shard_count),
+        shard_ids=[int(i) for i in shard_ids.split(",")] if shard_ids else None,
+    )
+else:
+    bot = CVBot(command_prefix="!", intents=intents)
+
+
+def _add_warming_up_stub(name: str) -> None:
+    async def warming_up(ctx: commands.Context) -> None:
+        await ctx.send(f"I'm still warming up; `!{name}` will be ready in a few seconds. Please try again shortly.")
+
+    bot.add_command(commands.Command(warming_up, name=name, help="Available once the bot has finished starting up."))
+
+
+async def load_commands(bot: commands.Bot) -> None:
+    """
+    Import the command modules in a background thread and swap each warming-up
+    stub for the real command. Models configured in CVBOT_WARMUP_MODELS are
+    loaded afterwards, so neither delays the connection to Discord.
+    """
+    for name, module_name in COMMAND_MODULES.items():
+        try:
+            module = await asyncio.to_thread(importlib.import_module, module_name)
+        except Exception:
+            logging.exception("An error occurred while loading the %s command.", name)
+            continue
+        bot.remove_command(name)
+        module.setup(bot)
+        _warming_up.discard(name)
+    _startup["commands"] = time.perf_counter() - STARTED_AT
+    logging.info("All commands ready %.1fs after start", _startup["commands"])
+    start_model_warm_up()
+
+
+def start_model_warm_up() -> None:
+    # Optionally preload models in the background, e.g. CVBOT_WARMUP_MODELS=chat,summarizer
+    # With CVBOT_INFERENCE_URL set the models live in the inference worker instead
+    warmup_models = os.environ.get("CVBOT_WARMUP_MODELS", "")
+    if warmup_models and not remote.enabled():
+        warm_up([name.strip() for name in warmup_models.split(",") if name.strip()])
+
+
+def _startup_metrics():
+    for phase, seconds in _startup.items():
+        yield "cvbot_startup_seconds", "gauge", {"phase": phase}, seconds
+
+
+metrics.register_collector(_startup_metrics)
 
-setup_reviewcv(bot)
-setup_extractinfo(bot)
 setup_help(bot)
-setup_cvformatcheck(bot)
-setup_cvmatch(bot)
-setup_interviewprep(bot)
-bot.run(DISCORD_TOKEN)
+if LAZY_COMMANDS:
+    for command_name in COMMAND_MODULES:
+        _add_warming_up_stub(command_name)
+else:
+    for module_path in COMMAND_MODULES.values():
+        importlib.import_module(module_path).setup(bot)
+
+
+@bot.event
+async def on_ready() -> None:
+    # Fires again after reconnects; only the first time is the startup
+    if "online" not in _startup:
+        _startup["online"] = time.perf_counter() - STARTED_AT
+        logging.info(
+            "Online as %s %.1fs after start (%d of %d commands ready)",
+            bot.user, _startup["online"], len(COMMAND_MODULES) - len(_warming_up), len(COMMAND_MODULES),
+        )
+
+
+@bot.before_invoke
+async def before_command(ctx: TimedContext) -> None:
+    # Heavy work started by the command is queued fairly per guild and user
+    scheduler.bind(ctx.guild.id if ctx.guild else None, ctx.author.id, ctx.send)
+    metrics.bind_command(ctx.command.qualified_name)
+    ctx.started_at = time.perf_counter()
+    ctx.profiler = metrics.start_profile(ctx.command.qualified_name)
+    models = COMMAND_MODELS.get(ctx.command.qualified_name, [])
+    if ctx.command.qualified_name not in _warming_up and not remote.enabled() and not all(map(is_loaded, models)):
+        await ctx.send("The AI models are still warming up, so the first answer may take a little longer.")
+
+
+@bot.after_invoke
+async def after_command(ctx: TimedContext) -> None:
+    name = ctx.command.qualified_name
+    metrics.COMMAND_SECONDS.observe(time.perf_counter() - ctx.started_at, command=name)
+    metrics.COMMANDS.inc(command=name, outcome="error" if ctx.command_failed else "ok")
+    if ctx.profiler is not None:
+        metrics.stop_profile(ctx.profiler, name)
+
+
+@bot.event
+async def on_command_error(ctx: commands.Context, error: commands.CommandError) -> None:
+    if not isinstance(error, commands.CommandInvokeError):
+        # Failed checks, cooldowns, unknown commands; invocations are counted after_invoke
+        metrics.COMMANDS.inc(command=ctx.command.qualified_name if ctx.command else "unknown", outcome=type(error).__name__)
+    if ctx.command and ctx.command.has_error_handler():
+        return
+    if isinstance(getattr(error, "original", None), scheduler.Overloaded):
+        await ctx.send(str(error.original))
+        return
+    logging.error("Ignoring exception in command %s", ctx.command, exc_info=error)
+
+
+# The PDF worker pool spawns processes that re-import this module, so only
+# start the bot when run as a script.
+if __name__ == "__main__":
+    configure_logging()
+    if not LAZY_COMMANDS:
+        start_model_warm_up()
+    bot.run(DISCORD_TOKEN)
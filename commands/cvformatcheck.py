@@ -1,15 +1,7 @@
 import discord
 from discord.ext import commands
-import tempfile
-import os
-from utils.cv_processor import extract_text_from_pdf
-
-section_synonyms = {
-    'education': ['education', 'academic', 'studies', 'school', 'university', 'college'],
-    'experience': ['experience', 'work history', 'employment', 'professional background', 'career'],
-    'skills': ['skills', 'abilities', 'competencies', 'proficiencies', 'expertise'],
-    'projects': ['projects', 'portfolio', 'works', 'case studies', 'assignments']
-}
+from utils.uploads import UploadRejected, load_cv_text
+from utils.text_analyzer import analyze_cv
 
 def setup(bot: commands.Bot) -> None:
     @bot.command()
@@ -33,28 +25,18 @@ def setup(bot: commands.Bot) -> None:
             await ctx.send("Timeout or invalid upload, please try again.")
             return
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            temp_path = tmp.name
-
         try:
-            await attachment.save(temp_path)
-            cv_text = extract_text_from_pdf(temp_path)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            _, cv_text = await load_cv_text(attachment)
+        except UploadRejected as e:
+            await ctx.send(str(e))
+            return
 
         # Simple checks
-        length = len(cv_text.split())
-        has_bullets = any(b in cv_text for b in ['•', '-', '*'])
-
-        found_sections = []
-        text = cv_text.lower()
-        for section, keywords in section_synonyms.items():
-            if any(keyword in text for keyword in keywords):
-                found_sections.append(section)
+        features = analyze_cv(cv_text)
+        found_sections = features.sections
 
-        msg = f"Word count: {length}\n"
-        msg += f"Bullet points: {'Yes' if has_bullets else 'No'}\n"
+        msg = f"Word count: {features.word_count}\n"
+        msg += f"Bullet points: {'Yes' if features.has_bullet_chars else 'No'}\n"
         msg += f"Sections found: {', '.join(found_sections) if found_sections else 'None'}\n"
 
         await ctx.send("**CV Format Check Results:**\n" + msg)
@@ -1,48 +1,26 @@
 import discord
 from discord.ext import commands
-import tempfile
-import os
-from utils.cv_processor import extract_text_from_pdf
+from utils.uploads import UploadRejected, load_cv_text
 import re
-import requests
-from bs4 import BeautifulSoup
-from transformers import pipeline
 import asyncio
-
-# Load the model ONCE at the top (this may take a while the first time)
-skill_pipe = pipeline("text-generation", model="TinyLlama/TinyLlama-1.1B-Chat-v1.0")
+import logging
+from ai.batching import generate
+from ai.models import model_identity
+from ai.prompts import build_skills_prompt
+from utils import candidate_index, cv_cache
+from utils.executors import run_blocking
+from utils import skill_matching
+from utils.job_fetch import fetch_job_description_from_url
 
 # Replace extract_keywords with LLM-based extraction
-async def extract_skills_llm(text: str) -> set:
-    prompt = (
-        "Extract a list of the main required skills and technologies from the following job description or CV. "
-        "Return only a comma-separated list of skills, no explanations.\n\n"
-        f"Text:\n{text}\n\nSkills:"
-    )
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, lambda: skill_pipe(prompt, max_new_tokens=60))
-    skills_text = result[0]['generated_text'].split("Skills:")[-1].strip()
+async def extract_skills_llm(text: str, kind: str = "cv") -> set:
+    # Pack the most relevant sections into the context window instead of truncating
+    prompt = await run_blocking(build_skills_prompt, text, 60, kind)
+    result = await generate(prompt, max_new_tokens=60)
+    skills_text = result.split("Skills:")[-1].strip()
     skills = [s.strip() for s in skills_text.split(',') if len(s.strip()) > 1]
     return set(skills)
 
-def fetch_job_description_from_url(url: str) -> str:
-    try:
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; CVHelperBot/1.0)"}
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        # Try to find the main job description content
-        # This is a simple heuristic; can be improved for specific job boards
-        for tag in ['section', 'div', 'article']:
-            for elem in soup.find_all(tag):
-                text = elem.get_text(separator=' ', strip=True)
-                if len(text) > 200:  # Heuristic: likely a job description
-                    return text
-        # Fallback: return all visible text
-        return soup.get_text(separator=' ', strip=True)
-    except Exception as e:
-        return f"[Error fetching job description: {e}]"
-
 def suggest_courses_for_skills(skills):
     suggestions = []
     for skill in list(skills)[:5]:  # Limit to 5 for brevity
@@ -52,6 +30,67 @@ def suggest_courses_for_skills(skills):
         suggestions.append(f"**{skill.title()}**:\n- [Coursera]({coursera})\n- [Udemy]({udemy})\n- [FreeCodeCamp]({freecodecamp})")
     return "\n\n".join(suggestions)
 
+async def get_cv_skills(doc: str, cv_text: str) -> set:
+    """
+    Return the LLM-extracted skills of a CV, cached per document and chat model.
+    """
+    async def llm_cv_skills() -> list:
+        return sorted(await extract_skills_llm(cv_text))
+
+    return set(await cv_cache.get_or_compute(doc, f"skills:{model_identity('chat')}", llm_cv_skills))
+
+async def index_cv(ctx: commands.Context, name: str, doc: str, cv_text: str, cv_skills: set) -> None:
+    """
+    Store an analyzed CV in the candidate index for !searchcandidates.
+    """
+    guild_id = ctx.guild.id if ctx.guild else 0
+    try:
+        score = await run_blocking(cv_cache.get, doc, "score")
+        await run_blocking(candidate_index.index_candidate, guild_id, name, doc, cv_text, cv_skills, score)
+    except Exception:
+        logging.exception("An error occurred while indexing a CV.")
+
+def match_skills(job_skills: set, cv_skills: set) -> tuple:
+    """
+    Compare job and CV skills, tolerating aliases and spelling variants.
+    Returns:
+        tuple: (match percentage, common skills, missing skills)
+    """
+    score, matched, missing = skill_matching.match_skills(job_skills, cv_skills)
+    return score, set(matched), set(missing)
+
+async def get_job_description(job_input: str) -> str:
+    """
+    Return the job description for pasted text or a job board URL.
+    Fetch failures are returned as an "[Error ...]" string.
+    """
+    if re.match(r'^https?://', job_input):
+        return await fetch_job_description_from_url(job_input)
+    return job_input
+
+async def extract_job_skills(job_desc_task: asyncio.Task) -> set:
+    job_desc = await job_desc_task
+    if job_desc.startswith('[Error'):
+        return set()
+    return await extract_skills_llm(job_desc, kind="job")
+
+async def wait_for_cv_upload(bot: commands.Bot, check, job_desc_task: asyncio.Task, timeout: float = 120):
+    """
+    Wait for the CV upload while the job description is prepared in the background.
+    Returns:
+        The upload message, or None if the job description could not be fetched.
+    Raises:
+        asyncio.TimeoutError: If no upload arrives in time.
+    """
+    upload = asyncio.ensure_future(bot.wait_for('message', check=check, timeout=timeout))
+    try:
+        done, _ = await asyncio.wait({upload, job_desc_task}, return_when=asyncio.FIRST_COMPLETED)
+        if job_desc_task in done and job_desc_task.result().startswith('[Error'):
+            return None
+        return await upload
+    finally:
+        upload.cancel()
+
 def setup(bot: commands.Bot) -> None:
     @bot.command()
     async def cvmatch(ctx: commands.Context) -> None:
@@ -73,55 +112,57 @@ def setup(bot: commands.Bot) -> None:
         # Detect if input is a URL
         if re.match(r'^https?://', job_input):
             await ctx.send("Fetching job description from the provided URL...")
-            job_desc = fetch_job_description_from_url(job_input)
-            if job_desc.startswith('[Error'):
-                await ctx.send(job_desc)
-                return
-        else:
-            job_desc = job_input
-
-        await ctx.send("Now, please upload the candidate's CV PDF file.")
-
-        def check_pdf(m: discord.Message) -> bool:
-            return (
-                m.author == ctx.author and
-                m.attachments and
-                m.attachments[0].filename.lower().endswith('.pdf')
-            )
 
+        # Work on the job description while the user picks their CV
+        job_desc_task = asyncio.create_task(get_job_description(job_input))
+        job_skills_task = asyncio.create_task(extract_job_skills(job_desc_task))
         try:
-            cv_msg = await bot.wait_for('message', check=check_pdf, timeout=120)
+            await ctx.send("Now, please upload the candidate's CV PDF file.")
+
+            def check_pdf(m: discord.Message) -> bool:
+                return (
+                    m.author == ctx.author and
+                    m.attachments and
+                    m.attachments[0].filename.lower().endswith('.pdf')
+                )
+
+            try:
+                cv_msg = await wait_for_cv_upload(bot, check_pdf, job_desc_task)
+            except Exception:
+                await ctx.send("Timeout or invalid upload for the CV. Please try again.")
+                return
+            if cv_msg is None:
+                await ctx.send(job_desc_task.result())
+                return
             attachment = cv_msg.attachments[0]
-        except Exception:
-            await ctx.send("Timeout or invalid upload for the CV. Please try again.")
-            return
 
-        await ctx.send("Processing, please wait...")
+            await ctx.send("Processing, please wait...")
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            temp_path = tmp.name
+            try:
+                doc, cv_text = await load_cv_text(attachment)
+            except UploadRejected as e:
+                await ctx.send(str(e))
+                return
 
-        try:
-            await attachment.save(temp_path)
-            cv_text = extract_text_from_pdf(temp_path)
+            # Job skills are usually ready by now; CV skills are cached per document
+            job_skills, cv_skills = await asyncio.gather(job_skills_task, get_cv_skills(doc, cv_text))
+            await index_cv(ctx, attachment.filename, doc, cv_text, cv_skills)
+            if job_desc_task.result().startswith('[Error'):
+                await ctx.send(job_desc_task.result())
+                return
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-        # Extract skills from both using LLM
-        job_skills = await extract_skills_llm(job_desc)
-        cv_skills = await extract_skills_llm(cv_text)
+            # Stop background work if the session ended early
+            job_desc_task.cancel()
+            job_skills_task.cancel()
 
         # Calculate match
-        common = job_skills & cv_skills
-        match_score = len(common) / max(1, len(job_skills)) * 100
+        match_score, common, missing = match_skills(job_skills, cv_skills)
 
         if match_score > 50:
             result = f"✅ The CV matches the job description! (Match: {match_score:.1f}%)"
         else:
             result = f"❌ The CV does not match the job description well. (Match: {match_score:.1f}%)"
 
-        missing = job_skills - cv_skills
         course_suggestions = suggest_courses_for_skills(missing)
         response = (
             f"{result}\n\n"
@@ -1,17 +1,10 @@
 import discord
 from discord.ext import commands
-import tempfile
-import os
-from utils.cv_processor import extract_text_from_pdf
+from utils.uploads import UploadRejected, load_cv_text
 from utils.scoring import extract_contact_info
+from utils import cv_cache
 import logging
 
-logging.basicConfig(
-    filename='logs/bot.log',
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s:%(name)s: %(message)s'
-)
-
 def setup(bot: commands.Bot) -> None:
     @bot.command()
     async def extractinfo(ctx: commands.Context) -> None:
@@ -35,17 +28,16 @@ def setup(bot: commands.Bot) -> None:
             await ctx.send("An unexpected error occurred. Please try again later.")
             return
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            temp_path = tmp.name
-
         try:
-            await attachment.save(temp_path)
-            cv_text = extract_text_from_pdf(temp_path)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            doc, cv_text = await load_cv_text(attachment)
+        except UploadRejected as e:
+            await ctx.send(str(e))
+            return
+
+        async def contact_info() -> dict:
+            return extract_contact_info(cv_text)
 
-        info = extract_contact_info(cv_text)
+        info = await cv_cache.get_or_compute(doc, "contact", contact_info)
         if not info:
             await ctx.send("No contact information found in the CV.")
         else:
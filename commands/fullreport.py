@@ -0,0 +1,161 @@
+import asyncio
+import discord
+from discord.ext import commands
+from utils.uploads import UploadRejected, load_cv_text
+from ai.ai_feedback import feedback_cache_name, fetch_cv_feedback
+import logging
+from typing import Awaitable
+from utils.grammar import count_grammar_errors
+from utils.scoring import extract_contact_info, score_cv
+from utils.text_analyzer import CVFeatures, analyze_cv
+from utils.executors import run_blocking
+from utils import cv_cache, metrics, scheduler
+
+
+async def analysis(cv_text: str) -> CVFeatures:
+    # Keyword and regex scans of a long CV take milliseconds; keep them off the event loop
+    with metrics.span("analyze"):
+        return await run_blocking(analyze_cv, cv_text)
+
+
+async def format_section(analyzed: Awaitable[CVFeatures]) -> str:
+    features = await analyzed
+    sections = features.sections
+    return (
+        "**Format Check**\n"
+        f"Word count: {features.word_count}\n"
+        f"Bullet points: {'Yes' if features.has_bullet_chars else 'No'}\n"
+        f"Sections found: {', '.join(sections) if sections else 'None'}"
+    )
+
+
+async def contact_section(doc: str, cv_text: str, analyzed: Awaitable[CVFeatures]) -> str:
+    async def contact_info() -> dict:
+        # Reads the analysis shared with the other sections instead of scanning again
+        await analyzed
+        return await run_blocking(extract_contact_info, cv_text)
+
+    info = await cv_cache.get_or_compute(doc, "contact", contact_info)
+    if not info:
+        return "**Contact Information**\nNo contact information found in the CV."
+    return "**Contact Information**\n" + "\n".join(f"**{key.capitalize()}**: {value}" for key, value in info.items())
+
+
+async def grammar_errors(doc: str, cv_text: str) -> int:
+    async def check() -> int:
+        with metrics.span("grammar"):
+            return await scheduler.run("grammar", run_blocking, count_grammar_errors, cv_text)
+
+    return await cv_cache.get_or_compute(doc, "grammar", check)
+
+
+async def grammar_section(errors: Awaitable[int]) -> str:
+    return f"**Grammar**\n{await errors} grammar or spelling issues found."
+
+
+async def score_section(doc: str, cv_text: str, errors: Awaitable[int], analyzed: Awaitable[CVFeatures]) -> str:
+    async def compute_score() -> int:
+        # Shares the grammar check and the analysis with the other sections instead of running them again
+        count = await errors
+        await analyzed
+        with metrics.span("score"):
+            return await run_blocking(score_cv, cv_text, grammar_errors=count)
+
+    score = await cv_cache.get_or_compute(doc, "score", compute_score)
+    return f"**CV Score**: {score}/100"
+
+
+async def feedback_section(doc: str, cv_text: str) -> str:
+    feedback = await cv_cache.get_or_compute(
+        doc, feedback_cache_name(), lambda: scheduler.run("summarizer", fetch_cv_feedback, cv_text)
+    )
+    if not feedback.strip():
+        return "**AI Feedback**\nSorry, I couldn't generate feedback for your CV."
+    return f"**AI Feedback**\n{feedback}"
+
+
+async def _section(title: str, coro: Awaitable[str]) -> str:
+    # A failing section is reported in its place; the others are still sent
+    try:
+        return await coro
+    except scheduler.Overloaded as e:
+        return f"**{title}**\n{e}"
+    except Exception:
+        logging.exception("An error occurred while building the %s section of a full report.", title)
+        return f"**{title}**\nSorry, this part of the report could not be produced."
+
+
+def setup(bot: commands.Bot) -> None:
+    """
+    Registers the fullreport command with the provided bot instance.
+    """
+    @bot.command()
+    @commands.cooldown(1, 120, commands.BucketType.user)
+    async def fullreport(ctx: commands.Context) -> None:
+        """
+        Review, score, grammar check, contact extraction and format check from one upload.
+        The CV is parsed once, every analysis runs at the same time, and each
+        section is sent as soon as it is ready.
+        """
+        await ctx.send("Please upload your CV PDF file for a full report.")
+
+        def check(m: discord.Message) -> bool:
+            return (
+                m.author == ctx.author and
+                m.attachments and
+                m.attachments[0].filename.lower().endswith(".pdf")
+            )
+
+        try:
+            msg = await bot.wait_for('message', check=check, timeout=120)
+            attachment = msg.attachments[0]
+        except Exception:
+            logging.exception("An error occurred while waiting for the CV upload in fullreport.")
+            await ctx.send("An unexpected error occurred. Please try again later.")
+            return
+
+        try:
+            doc, cv_text = await load_cv_text(attachment)
+        except UploadRejected as e:
+            await ctx.send(str(e))
+            return
+
+        if not cv_text.strip():
+            await ctx.send(
+                "Sorry, I couldn't extract any text from your PDF. "
+                "This may happen if your CV is scanned or contains only images. "
+                "Please try uploading a text-based PDF."
+            )
+            return
+
+        await ctx.send("Analyzing your CV... Each part of the report is sent as soon as it is ready.")
+        errors = asyncio.ensure_future(grammar_errors(doc, cv_text))
+        analyzed = asyncio.ensure_future(analysis(cv_text))
+        tasks = [
+            asyncio.ensure_future(_section(title, coro))
+            for title, coro in (
+                ("Format Check", format_section(analyzed)),
+                ("Contact Information", contact_section(doc, cv_text, analyzed)),
+                ("Grammar", grammar_section(errors)),
+                ("CV Score", score_section(doc, cv_text, errors, analyzed)),
+                ("AI Feedback", feedback_section(doc, cv_text)),
+            )
+        ]
+        try:
+            for next_section in asyncio.as_completed(tasks):
+                await ctx.send(await next_section)
+        finally:
+            for task in tasks + [errors, analyzed]:
+                task.cancel()
+
+    @fullreport.error
+    async def fullreport_error(ctx: commands.Context, error: Exception) -> None:
+        if isinstance(error, commands.CommandOnCooldown):
+            await ctx.send(
+                f"This command is on cooldown. Please wait {int(error.retry_after)} seconds before using it again."
+            )
+        elif isinstance(getattr(error, "original", None), scheduler.Overloaded):
+            await ctx.send(str(error.original))
+        else:
+            logging.exception("An error occurred in fullreport_error.")
+            await ctx.send("An unexpected error occurred. Please try again later.")
@@ -10,9 +10,12 @@ def setup(bot: commands.Bot) -> None:
             "**CV Helper Bot Commands:**\n\n"
             "`!reviewcv` — Analyze and summarize a CV, provide feedback, and score it.\n"
             "`!extractinfo` — Extract contact information (email, phone, LinkedIn) from a CV.\n"
+            "`!fullreport` — Review, score, grammar check, contact info and format check from a single upload, sent section by section.\n"
             "`!cvformatcheck` — Check if the CV follows best formatting practices (length, sections, bullet points, etc.).\n"
             "`!cvmatch` — Compare a job description (text or job board URL) and a CV, and say if they match, using AI to extract and match real skills.\n"
             "`!interviewprep` — Generate likely interview questions from a job description (text or URL) and a CV, and quiz you interactively.\n"
+            "`!rankcvs` — Rank many CVs (PDFs or a zip, attached to the command) against one job description.\n"
+            "`!searchcandidates` — Match a job description against every CV already analyzed in this server.\n"
             "`!cvhelp` — List all available commands and what they do.\n"
         )
         await ctx.send(help_text)
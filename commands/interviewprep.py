@@ -1,16 +1,55 @@
 import discord
 from discord.ext import commands
-import tempfile
-import os
-from utils.cv_processor import extract_text_from_pdf
-from transformers import pipeline
+from utils.uploads import UploadRejected, load_cv_text
 import asyncio
+import logging
 import re
-import requests
-from bs4 import BeautifulSoup
+from ai.streaming import stream_generate
+from ai.prompts import build_interview_prompt
+from commands.cvmatch import get_job_description, wait_for_cv_upload
+from utils import scheduler
+from utils.executors import run_blocking
+
+MAX_NEW_TOKENS = 200
+
+
+def parse_question(line: str):
+    """
+    Return the interview question on a generated line, or None if the line
+    is not one.
+    """
+    question = line.strip().strip("- ")
+    if len(question) > 10 and (question.endswith('?') or question[0].isdigit()):
+        return question
+    return None
+
+
+async def produce_questions(prompt: str, questions: asyncio.Queue) -> None:
+    """
+    Stream the generation and put each question on the queue as soon as its
+    line is complete. None is put on the queue when generation has finished.
+    Raises:
+        Overloaded: If the scheduler's LLM queue is full.
+    """
+    buffer = ""
+    try:
+        async for piece in stream_generate(prompt, max_new_tokens=MAX_NEW_TOKENS):
+            buffer += piece
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                question = parse_question(line)
+                if question:
+                    questions.put_nowait(question)
+        question = parse_question(buffer)
+        if question:
+            questions.put_nowait(question)
+    except scheduler.Overloaded:
+        raise
+    except Exception:
+        logging.exception("An error occurred while generating interview questions.")
+    finally:
+        questions.put_nowait(None)
 
-# Load the model ONCE at the top (this may take a while the first time)
-pipe = pipeline("text-generation", model="TinyLlama/TinyLlama-1.1B-Chat-v1.0")
 
 def setup(bot: commands.Bot) -> None:
     @bot.command()
@@ -34,115 +73,97 @@ def setup(bot: commands.Bot) -> None:
         # Detect if input is a URL
         if re.match(r'^https?://', job_input):
             await ctx.send("Fetching job description from the provided URL...")
-            def fetch_job_description_from_url(url: str) -> str:
-                try:
-                    headers = {"User-Agent": "Mozilla/5.0 (compatible; CVHelperBot/1.0)"}
-                    resp = requests.get(url, headers=headers, timeout=10)
-                    resp.raise_for_status()
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    for tag in ['section', 'div', 'article']:
-                        for elem in soup.find_all(tag):
-                            text = elem.get_text(separator=' ', strip=True)
-                            if len(text) > 200:
-                                return text
-                    return soup.get_text(separator=' ', strip=True)
-                except Exception as e:
-                    return f"[Error fetching job description: {e}]"
-            job_desc = fetch_job_description_from_url(job_input)
-            if job_desc.startswith('[Error'):
-                await ctx.send(job_desc)
-                return
             await ctx.send(f"**Job Link:** {job_input}")
         else:
-            job_desc = job_input
             await ctx.send("**Job Description received.**")
 
-        await ctx.send("Now, please upload the candidate's CV PDF file.")
+        # Fetch the job description while the user picks their CV
+        job_desc_task = asyncio.create_task(get_job_description(job_input))
+        try:
+            await ctx.send("Now, please upload the candidate's CV PDF file.")
 
-        def check_pdf(m: discord.Message) -> bool:
-            return (
-                m.author == ctx.author and
-                m.attachments and
-                m.attachments[0].filename.lower().endswith('.pdf')
-            )
+            def check_pdf(m: discord.Message) -> bool:
+                return (
+                    m.author == ctx.author and
+                    m.attachments and
+                    m.attachments[0].filename.lower().endswith('.pdf')
+                )
 
-        try:
-            cv_msg = await bot.wait_for('message', check=check_pdf, timeout=120)
+            try:
+                cv_msg = await wait_for_cv_upload(bot, check_pdf, job_desc_task)
+            except Exception:
+                await ctx.send("Timeout or invalid upload for the CV. Please try again.")
+                return
+            if cv_msg is None:
+                await ctx.send(job_desc_task.result())
+                return
             attachment = cv_msg.attachments[0]
-        except Exception:
-            await ctx.send("Timeout or invalid upload for the CV. Please try again.")
-            return
-
-        await ctx.send("Processing, please wait...")
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            temp_path = tmp.name
+            await ctx.send("Processing, please wait...")
 
-        try:
-            await attachment.save(temp_path)
-            cv_text = extract_text_from_pdf(temp_path)
+            try:
+                _, cv_text = await load_cv_text(attachment)
+            except UploadRejected as e:
+                await ctx.send(str(e))
+                return
+            job_desc = await job_desc_task
+            if job_desc.startswith('[Error'):
+                await ctx.send(job_desc)
+                return
         finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-        # Truncate to avoid exceeding model context length
-        max_chars = 500
-        if len(job_desc) > max_chars:
-            job_desc = job_desc[:max_chars]
-        if len(cv_text) > max_chars:
-            cv_text = cv_text[:max_chars]
-
-        # Generate interview questions locally
-        prompt = (
-            "Given the following job description and candidate CV, generate 1-5 likely interview questions the candidate might face. "
-            "Focus on the required skills, experience, and any gaps.\n\n"
-            f"Job Description:\n{job_desc}\n\n"
-            f"Candidate CV:\n{cv_text}\n\n"
-            "Interview Questions:"
-        )
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None, lambda: pipe(prompt, max_new_tokens=200)
-        )
-        questions_text = result[0]['generated_text'].split("Interview Questions:")[-1].strip()
-        # Split questions by line or number
-        questions = [q.strip("- ") for q in questions_text.split("\n") if q.strip()]
-        # Remove empty and non-question lines
-        questions = [q for q in questions if len(q) > 10 and (q.endswith('?') or q[0].isdigit())]
-        if not questions:
-            await ctx.send("Sorry, I couldn't generate interview questions. Please try again.")
-            return
-
-        await ctx.send(f"I have generated {len(questions)} interview questions. Do you want to start with the first question? (yes/no)")
-
-        def check_yes_no(m: discord.Message) -> bool:
-            return m.author == ctx.author and m.content.lower() in ['yes', 'no']
-
+            # Stop background work if the session ended early
+            job_desc_task.cancel()
+
+        # Generate interview questions locally, packing the most relevant
+        # sections of both texts into the model's context window
+        prompt = await run_blocking(build_interview_prompt, job_desc, cv_text, MAX_NEW_TOKENS)
+        # Questions are parsed as their lines complete, so the first one can be
+        # asked while the rest are still being generated
+        questions: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(produce_questions(prompt, questions))
         try:
-            reply = await bot.wait_for('message', check=check_yes_no, timeout=60)
-        except Exception:
-            await ctx.send("No response received. Session ended.")
-            return
+            first = await questions.get()
+            if first is None:
+                # Generation has ended; re-raises if the scheduler turned it away
+                await producer
+                await ctx.send("Sorry, I couldn't generate interview questions. Please try again.")
+                return
 
-        if reply.content.lower() != 'yes':
-            await ctx.send("Okay, session ended. You can run !interviewprep again anytime.")
-            return
+            await ctx.send("The first interview question is ready (more are on the way). Do you want to start? (yes/no)")
+
+            def check_yes_no(m: discord.Message) -> bool:
+                return m.author == ctx.author and m.content.lower() in ['yes', 'no']
 
-        # Ask questions one by one
-        for idx, question in enumerate(questions, 1):
-            await ctx.send(f"Question {idx}: {question}")
-            try:
-                answer = await bot.wait_for('message', check=lambda m: m.author == ctx.author, timeout=180)
-            except Exception:
-                await ctx.send("No answer received. Moving to the next question.")
-                continue
-            await ctx.send(f"Received your answer. Ready for the next question? (yes/no)")
             try:
-                next_reply = await bot.wait_for('message', check=check_yes_no, timeout=60)
+                reply = await bot.wait_for('message', check=check_yes_no, timeout=60)
             except Exception:
                 await ctx.send("No response received. Session ended.")
                 return
-            if next_reply.content.lower() != 'yes':
+
+            if reply.content.lower() != 'yes':
                 await ctx.send("Okay, session ended. You can run !interviewprep again anytime.")
                 return
-        await ctx.send("You have completed all the interview questions! Good luck with your preparation.")
\ No newline at end of file
+
+            # Ask questions one by one; later ones are generated during the answers
+            idx, question = 1, first
+            while question is not None:
+                await ctx.send(f"Question {idx}: {question}")
+                try:
+                    answer = await bot.wait_for('message', check=lambda m: m.author == ctx.author, timeout=180)
+                except Exception:
+                    await ctx.send("No answer received. Moving to the next question.")
+                else:
+                    await ctx.send(f"Received your answer. Ready for the next question? (yes/no)")
+                    try:
+                        next_reply = await bot.wait_for('message', check=check_yes_no, timeout=60)
+                    except Exception:
+                        await ctx.send("No response received. Session ended.")
+                        return
+                    if next_reply.content.lower() != 'yes':
+                        await ctx.send("Okay, session ended. You can run !interviewprep again anytime.")
+                        return
+                idx, question = idx + 1, await questions.get()
+            await ctx.send("You have completed all the interview questions! Good luck with your preparation.")
+        finally:
+            # Stops generation if the session ended before all questions were produced
+            producer.cancel()
@@ -0,0 +1,220 @@
+import asyncio
+import csv
+import io
+import logging
+import os
+import re
+import time
+import zipfile
+import zlib
+from typing import List, Tuple
+
+import discord
+from discord.ext import commands
+
+from commands.cvmatch import extract_job_skills, get_cv_skills, get_job_description, index_cv, match_skills
+from utils import scheduler
+from utils.executors import run_blocking
+from utils.uploads import MAX_UPLOAD_BYTES, UploadRejected, is_pdf, load_cv_bytes
+
+MAX_CVS = int(os.environ.get("CVBOT_RANK_MAX_CVS", 100))
+# CVs parsed and sent to the LLM at the same time (prompts are batched together)
+CONCURRENCY = int(os.environ.get("CVBOT_RANK_CONCURRENCY", 8))
+MAX_ZIP_BYTES = 25 * 2**20
+# Total size of the PDFs inflated from one zip
+MAX_UNZIPPED_BYTES = int(os.environ.get("CVBOT_RANK_MAX_UNZIPPED_BYTES", 100 * 2**20))
+LEADERBOARD_SIZE = 15
+# Seconds between edits of the progress message
+UPDATE_INTERVAL = 2.0
+
+
+def _unzip_pdfs(data: bytes) -> List[Tuple[str, bytes]]:
+    files = []
+    total = 0
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name.lower().endswith(".pdf") or info.filename.startswith("__MACOSX"):
+                    continue
+                # Check the declared size before inflating anything
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    continue
+                if total + info.file_size > MAX_UNZIPPED_BYTES:
+                    raise UploadRejected(
+                        "The PDFs in the zip archive are too large together. "
+                        f"Please keep them under {MAX_UNZIPPED_BYTES / 2**20:.0f} MB in total."
+                    )
+                try:
+                    # zipfile stops at the declared size and rejects an entry that does not match it
+                    pdf = archive.read(info)
+                except (zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError) as e:
+                    # CRC or size mismatch, corrupt data, unsupported compression or encryption:
+                    # skip this member and keep the rest of the batch
+                    logging.info("Skipping unreadable zip entry %s: %s", info.filename, e)
+                    continue
+                total += len(pdf)
+                if not is_pdf(pdf):
+                    continue
+                files.append((name, pdf))
+                if len(files) >= MAX_CVS:
+                    break
+    except zipfile.BadZipFile as e:
+        raise UploadRejected("The zip archive could not be read. Please upload a valid zip of PDF files.") from e
+    return files
+
+
+async def collect_pdfs(attachments: List[discord.Attachment]) -> List[Tuple[str, bytes]]:
+    """
+    Read every PDF attachment, unpacking zip archives.
+    Returns:
+        list: (filename, PDF bytes) pairs, at most MAX_CVS of them.
+    """
+    files = []
+    for attachment in attachments:
+        name = attachment.filename.lower()
+        if name.endswith(".pdf") and attachment.size <= MAX_UPLOAD_BYTES:
+            data = await attachment.read()
+            if is_pdf(data):
+                files.append((attachment.filename, data))
+        elif name.endswith(".zip"):
+            if attachment.size > MAX_ZIP_BYTES:
+                raise UploadRejected(
+                    f"The zip archive is too large. Please keep it under {MAX_ZIP_BYTES / 2**20:.0f} MB."
+                )
+            files.extend(await run_blocking(_unzip_pdfs, await attachment.read()))
+    return files[:MAX_CVS]
+
+
+def render_leaderboard(results: list, failed: list, total: int, done: bool) -> str:
+    processed = len(results) + len(failed)
+    filled = int(20 * processed / max(1, total))
+    status = "Finished" if done else "Ranking"
+    lines = [f"**{status} {total} CVs** `{'▓' * filled}{'░' * (20 - filled)}` {processed}/{total}"]
+    ranked = sorted(results, key=lambda r: r[1], reverse=True)
+    for rank, (name, score, common) in enumerate(ranked[:LEADERBOARD_SIZE], 1):
+        skills = ", ".join(sorted(common)[:4])
+        lines.append(f"`{rank:>2}.` **{name[:40]}** — {score:.1f}%" + (f" ({skills})" if skills else ""))
+    if len(ranked) > LEADERBOARD_SIZE:
+        lines.append(f"... and {len(ranked) - LEADERBOARD_SIZE} more")
+    if failed:
+        lines.append(f"Could not read: {', '.join(name[:30] for name in failed[:5])}" + (" ..." if len(failed) > 5 else ""))
+    return "\n".join(lines)
+
+
+def setup(bot: commands.Bot) -> None:
+    @bot.command()
+    @commands.cooldown(1, 120, commands.BucketType.user)
+    async def rankcvs(ctx: commands.Context, *, job_input: str = "") -> None:
+        """
+        Rank many CVs against one job description.
+        Usage: !rankcvs <job description or URL> with the CV PDFs (or a zip of them) attached.
+        """
+        def check_msg(m: discord.Message) -> bool:
+            return m.author == ctx.author and m.channel == ctx.channel and m.content
+
+        job_input = job_input.strip()
+        if not job_input:
+            await ctx.send("Please paste the job description (as text or a job board URL).")
+            try:
+                job_msg = await bot.wait_for('message', check=check_msg, timeout=180)
+                job_input = job_msg.content.strip()
+            except Exception:
+                await ctx.send("Timeout or invalid job description. Please try again.")
+                return
+
+        if re.match(r'^https?://', job_input):
+            await ctx.send("Fetching job description from the provided URL...")
+
+        # The job side is worked on once, while the CVs are read and parsed
+        job_desc_task = asyncio.create_task(get_job_description(job_input))
+        job_skills_task = asyncio.create_task(extract_job_skills(job_desc_task))
+        tasks = []
+        try:
+            attachments = list(ctx.message.attachments)
+            if not attachments:
+                await ctx.send("Now, please upload the CV PDF files (or a zip of them) in one message.")
+
+                def check_files(m: discord.Message) -> bool:
+                    return m.author == ctx.author and m.channel == ctx.channel and bool(m.attachments)
+
+                try:
+                    files_msg = await bot.wait_for('message', check=check_files, timeout=180)
+                    attachments = list(files_msg.attachments)
+                except Exception:
+                    await ctx.send("Timeout or invalid upload. Please try again.")
+                    return
+
+            try:
+                files = await collect_pdfs(attachments)
+            except UploadRejected as e:
+                await ctx.send(str(e))
+                return
+            if not files:
+                await ctx.send(f"No PDF files found. Attach PDFs (each under {MAX_UPLOAD_BYTES / 2**20:.0f} MB) or a zip of them.")
+                return
+
+            semaphore = asyncio.Semaphore(CONCURRENCY)
+
+            async def rank_one(name: str, data: bytes) -> tuple:
+                async with semaphore:
+                    doc, cv_text = await load_cv_bytes(data)
+                    if not cv_text.strip():
+                        raise UploadRejected("no text")
+                    cv_skills = await get_cv_skills(doc, cv_text)
+                    await index_cv(ctx, name, doc, cv_text, cv_skills)
+                score, common, _ = match_skills(await job_skills_task, cv_skills)
+                return name, score, common
+
+            async def named(name: str, data: bytes) -> tuple:
+                try:
+                    return True, await rank_one(name, data)
+                except (UploadRejected, scheduler.Overloaded):
+                    return False, name
+                except Exception:
+                    logging.exception("An error occurred while ranking %s.", name)
+                    return False, name
+
+            results, failed = [], []
+            status = await ctx.send(render_leaderboard(results, failed, len(files), done=False))
+            last_update = time.monotonic()
+            tasks = [asyncio.ensure_future(named(name, data)) for name, data in files]
+            for next_done in asyncio.as_completed(tasks):
+                ok, value = await next_done
+                (results if ok else failed).append(value)
+                if job_desc_task.done() and job_desc_task.result().startswith('[Error'):
+                    await ctx.send(job_desc_task.result())
+                    return
+                if job_skills_task.done() and isinstance(job_skills_task.exception(), scheduler.Overloaded):
+                    raise job_skills_task.exception()
+                if time.monotonic() - last_update >= UPDATE_INTERVAL:
+                    await status.edit(content=render_leaderboard(results, failed, len(files), done=False))
+                    last_update = time.monotonic()
+            await status.edit(content=render_leaderboard(results, failed, len(files), done=True))
+
+            # Full ranking as a CSV attachment
+            ranked = sorted(results, key=lambda r: r[1], reverse=True)
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(["rank", "file", "match_percent", "common_skills"])
+            for rank, (name, score, common) in enumerate(ranked, 1):
+                writer.writerow([rank, name, f"{score:.1f}", "; ".join(sorted(common))])
+            await ctx.send(file=discord.File(io.BytesIO(out.getvalue().encode("utf-8")), filename="ranking.csv"))
+        finally:
+            # Stop background work if the session ended early
+            for task in tasks:
+                task.cancel()
+            job_desc_task.cancel()
+            job_skills_task.cancel()
+
+    @rankcvs.error
+    async def rankcvs_error(ctx: commands.Context, error: Exception) -> None:
+        if isinstance(error, commands.CommandOnCooldown):
+            await ctx.send(
+                f"This command is on cooldown. Please wait {int(error.retry_after)} seconds before using it again."
+            )
+        elif isinstance(getattr(error, "original", None), scheduler.Overloaded):
+            await ctx.send(str(error.original))
+        else:
+            logging.exception("An error occurred in rankcvs_error.")
+            await ctx.send("An unexpected error occurred. Please try again later.")
@@ -1,17 +1,12 @@
+import asyncio
 import discord
 from discord.ext import commands
-import tempfile
-from utils.cv_processor import extract_text_from_pdf
-from ai.ai_feedback import get_cv_feedback
+from utils.uploads import UploadRejected, load_cv_text
+from ai.ai_feedback import feedback_cache_name, fetch_cv_feedback
 import logging
-import os
 from utils.scoring import score_cv
-
-logging.basicConfig(
-    filename='logs/bot.log',
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s:%(name)s: %(message)s'
-)
+from utils.executors import run_blocking
+from utils import cv_cache, metrics, scheduler
 
 def setup(bot: commands.Bot) -> None:
     """
@@ -42,15 +37,11 @@ def setup(bot: commands.Bot) -> None:
             await ctx.send("An unexpected error occurred. Please try again later.")
             return
 
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            temp_path = tmp.name
-
         try:
-            await attachment.save(temp_path)
-            cv_text = extract_text_from_pdf(temp_path)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            doc, cv_text = await load_cv_text(attachment)
+        except UploadRejected as e:
+            await ctx.send(str(e))
+            return
 
         if not cv_text.strip():
             await ctx.send(
@@ -61,14 +52,24 @@ def setup(bot: commands.Bot) -> None:
             return
 
         await ctx.send("Analyzing your CV... Please wait.")
-        feedback = get_cv_feedback(cv_text)
+
+        async def compute_score() -> int:
+            with metrics.span("score"):
+                return await scheduler.run("grammar", run_blocking, score_cv, cv_text)
+
+        # Summary and score use different workers, so they run at the same time
+        feedback, score = await asyncio.gather(
+            cv_cache.get_or_compute(
+                doc, feedback_cache_name(), lambda: scheduler.run("summarizer", fetch_cv_feedback, cv_text)
+            ),
+            cv_cache.get_or_compute(doc, "score", compute_score),
+        )
         if not feedback.strip():
             await ctx.send(
                 "Sorry, I couldn't generate feedback for your CV. "
                 "Please try again later or check your file."
             )
             return
-        score = score_cv(cv_text)
         await ctx.send(f"Your CV Score: {score}/100\n\nHere is your CV feedback:\n{feedback}")
 
     @reviewcv.error
@@ -77,6 +78,8 @@ def setup(bot: commands.Bot) -> None:
             await ctx.send(
                 f"This command is on cooldown. Please wait {int(error.retry_after)} seconds before using it again."
             )
+        elif isinstance(getattr(error, "original", None), scheduler.Overloaded):
+            await ctx.send(str(error.original))
         else:
             logging.exception("An error occurred in reviewcv_error.")
             await ctx.send("An unexpected error occurred. Please try again later.")
@@ -0,0 +1,62 @@
+import discord
+from discord.ext import commands
+import asyncio
+import re
+from commands.cvmatch import extract_job_skills, get_job_description
+from utils import candidate_index
+from utils.executors import run_blocking
+
+def setup(bot: commands.Bot) -> None:
+    @bot.command()
+    async def searchcandidates(ctx: commands.Context, *, job_input: str = "") -> None:
+        """
+        Match a job description (text or URL) against every CV already analyzed in this server.
+        """
+        guild_id = ctx.guild.id if ctx.guild else 0
+        pool_size = await run_blocking(candidate_index.candidate_count, guild_id)
+        if not pool_size:
+            await ctx.send("No candidates have been indexed yet. Analyze CVs with `!cvmatch` or `!rankcvs` first.")
+            return
+
+        job_input = job_input.strip()
+        if not job_input:
+            await ctx.send("Please paste the job description (as text or a job board URL).")
+
+            def check_msg(m: discord.Message) -> bool:
+                return m.author == ctx.author and m.content
+
+            try:
+                job_msg = await bot.wait_for('message', check=check_msg, timeout=180)
+                job_input = job_msg.content.strip()
+            except Exception:
+                await ctx.send("Timeout or invalid job description. Please try again.")
+                return
+
+        if re.match(r'^https?://', job_input):
+            await ctx.send("Fetching job description from the provided URL...")
+        await ctx.send(f"Searching {pool_size} indexed candidates, please wait...")
+
+        job_desc_task = asyncio.create_task(get_job_description(job_input))
+        job_skills = await extract_job_skills(job_desc_task)
+        if job_desc_task.result().startswith('[Error'):
+            await ctx.send(job_desc_task.result())
+            return
+        if not job_skills:
+            await ctx.send("Sorry, I couldn't extract any skills from the job description.")
+            return
+
+        matches = await run_blocking(candidate_index.search, guild_id, job_skills, 10)
+        if not matches:
+            await ctx.send("No indexed candidate has any of the required skills.")
+            return
+
+        lines = [f"**Best matches for:** {', '.join(sorted(job_skills)[:10])}\n"]
+        for rank, match in enumerate(matches, 1):
+            contact = match["email"] or match["phone"] or "no contact info"
+            lines.append(
+                f"`{rank:>2}.` **{match['name'][:40]}** — {match['match']:.1f}% ({contact})\n"
+                f"      {', '.join(sorted(match['common'])[:6])}"
+            )
+        response = "\n".join(lines)
+        for chunk in [response[i:i+1900] for i in range(0, len(response), 1900)]:
+            await ctx.send(chunk)
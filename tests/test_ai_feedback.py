@@ -0,0 +1,9 @@
+from ai.ai_feedback import feedback_cache_name
+
+
+def test_feedback_cache_name_depends_on_the_summarizer_backend(monkeypatch):
+    monkeypatch.setenv("CVBOT_SUMMARIZER_BACKEND", "torch")
+    torch_name = feedback_cache_name()
+    monkeypatch.setenv("CVBOT_SUMMARIZER_BACKEND", "onnx")
+    assert torch_name.startswith("summary:")
+    assert feedback_cache_name() != torch_name
@@ -0,0 +1,38 @@
+import pytest
+
+from utils import candidate_index
+
+CV = "Jane Doe\nSkills\nPython, SQL, Docker\n"
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate_index, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(candidate_index, "_db", None)
+    yield
+    if candidate_index._db is not None:
+        candidate_index._db.close()
+
+
+def test_re_export_without_email_updates_the_same_candidate():
+    first = candidate_index.index_candidate(1, "cv.pdf", "pdf-hash-1", CV, ["Python", "SQL"])
+    # Same text from a different PDF export, with different line breaks and case
+    reexported = CV.upper().replace("\n", "  \n")
+    second = candidate_index.index_candidate(1, "cv (1).pdf", "pdf-hash-2", reexported, ["Python"])
+    assert first == second
+    assert candidate_index.candidate_count(1) == 1
+    assert [r["name"] for r in candidate_index.search(1, ["python"])] == ["cv (1).pdf"]
+    assert candidate_index.search(1, ["sql"]) == []
+
+
+def test_edited_cv_is_matched_by_email():
+    first = candidate_index.index_candidate(1, "a.pdf", "pdf-hash-1", CV + "jane@example.com\n", ["Python"])
+    second = candidate_index.index_candidate(1, "b.pdf", "pdf-hash-2", CV + "Go\nJane@Example.com\n", ["Go"])
+    assert first == second == "jane@example.com"
+    assert candidate_index.candidate_count(1) == 1
+
+
+def test_edited_cv_without_email_is_a_new_candidate():
+    candidate_index.index_candidate(1, "a.pdf", "pdf-hash-1", CV, ["Python"])
+    candidate_index.index_candidate(1, "b.pdf", "pdf-hash-2", CV + "Go\n", ["Go"])
+    assert candidate_index.candidate_count(1) == 2
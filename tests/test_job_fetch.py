@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils import job_fetch
+
+PAGE = "<html><body><main><h1>Backend Engineer</h1><p>{}</p></main></body></html>"
+DESCRIPTION = "We are hiring a backend engineer with Python, SQL and Docker experience. " * 5
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(job_fetch, "_cache", job_fetch.OrderedDict())
+    monkeypatch.setattr(job_fetch, "_inflight", {})
+    monkeypatch.setattr(job_fetch, "_stats", dict.fromkeys(job_fetch._stats, 0))
+
+
+class JobBoard:
+    """
+    A job page served with an ETag; counts the requests it receives.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        await asyncio.sleep(self.delay)
+        return web.Response(text=PAGE.format(DESCRIPTION), content_type="text/html", headers={"ETag": '"v1"'})
+
+    async def broken(self, request: web.Request) -> web.Response:
+        self.requests.append(None)
+        return web.Response(status=500)
+
+
+def run(board: JobBoard, scenario) -> None:
+    async def main():
+        app = web.Application()
+        app.router.add_get("/job", board.handle)
+        app.router.add_get("/broken", board.broken)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            await scenario(str(server.make_url("/job")), str(server.make_url("/broken")))
+        finally:
+            # The shared session belongs to this event loop
+            await job_fetch.close_session()
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_fresh_entry_is_served_without_a_request():
+    board = JobBoard()
+
+    async def scenario(url, _):
+        first = await job_fetch.fetch_job_description_from_url(url)
+        second = await job_fetch.fetch_job_description_from_url(url)
+        assert "backend engineer" in first.lower()
+        assert second == first
+
+    run(board, scenario)
+    assert board.requests == [None]
+    assert job_fetch.cache_stats()["hits"] == 1
+    assert job_fetch.cache_stats()["misses"] == 1
+
+
+def test_stale_entry_is_revalidated_with_its_etag(monkeypatch):
+    board = JobBoard()
+    monkeypatch.setattr(job_fetch, "CACHE_TTL", 0)
+
+    async def scenario(url, _):
+        first = await job_fetch.fetch_job_description_from_url(url)
+        assert await job_fetch.fetch_job_description_from_url(url) == first
+
+    run(board, scenario)
+    # The second request sends the stored ETag and the 304 serves the stored text
+    assert board.requests == [None, '"v1"']
+    assert job_fetch.cache_stats()["revalidated"] == 1
+    assert job_fetch.cache_stats()["misses"] == 1
+
+
+def test_concurrent_requests_share_one_fetch():
+    board = JobBoard(delay=0.2)
+
+    async def scenario(url, _):
+        results = await asyncio.gather(*(job_fetch.fetch_job_description_from_url(url) for _ in range(5)))
+        assert len(set(results)) == 1
+
+    run(board, scenario)
+    assert board.requests == [None]
+    assert job_fetch.cache_stats()["collapsed"] == 4
+    assert job_fetch.cache_stats()["in_flight"] == 0
+
+
+def test_failed_fetch_returns_an_error_string():
+    board = JobBoard()
+
+    async def scenario(_, url):
+        result = await job_fetch.fetch_job_description_from_url(url)
+        assert result.startswith("[Error fetching job description:")
+        assert "500" in result
+
+    run(board, scenario)
+    assert job_fetch.cache_stats()["errors"] == 1
+    assert job_fetch.cache_stats()["size"] == 0
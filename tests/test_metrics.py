@@ -0,0 +1,14 @@
+from ai import models
+from utils import metrics
+
+
+def test_model_and_process_memory_are_exported(monkeypatch):
+    monkeypatch.setitem(models._stats, "chat", {
+        "loads": 1, "model_id": "m", "backend": "torch", "load_seconds": 3.5, "rss_bytes": 2**30, "loaded_at": 1,
+    })
+    monkeypatch.setitem(models._models, "chat", object())
+    lines = metrics.render().splitlines()
+    assert 'cvbot_model_load_seconds{model="chat"} 3.5' in lines
+    assert 'cvbot_model_rss_bytes{model="chat"} 1073741824' in lines
+    assert 'cvbot_model_loaded{model="chat"} 1' in lines
+    assert any(line.startswith("cvbot_process_rss_bytes ") for line in lines)
@@ -0,0 +1,37 @@
+import pytest
+
+from ai.prompts import _is_low_value, pack_text
+
+
+class WhitespaceTokenizer:
+    def __call__(self, text, add_special_tokens=True):
+        if isinstance(text, list):
+            return {"input_ids": [t.split() for t in text]}
+        return {"input_ids": text.split()}
+
+
+@pytest.mark.parametrize("line", [
+    "Led 3 engineers on Main Street redesign",
+    "Managed 12345 Customers across EMEA",
+    "Improved 5 APIs in st louis office",
+])
+def test_achievements_are_not_contact_noise(line):
+    assert not _is_low_value(line)
+
+
+@pytest.mark.parametrize("line", [
+    "12 Main Street",
+    "221b Baker St., London",
+    "75001 Paris",
+    "jane@example.com | +1 555 123 4567 | https://example.com",
+    "Page 2 of 3",
+])
+def test_contact_lines_are_low_value(line):
+    assert _is_low_value(line)
+
+
+def test_pack_text_keeps_achievements_and_drops_the_address():
+    cv = "Jane Doe\n12 Main Street\nExperience\nLed 3 engineers on Main Street redesign\n"
+    packed = pack_text(cv, budget=100, tokenizer=WhitespaceTokenizer())
+    assert "Led 3 engineers on Main Street redesign" in packed
+    assert "12 Main Street" not in packed.splitlines()
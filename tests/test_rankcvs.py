@@ -0,0 +1,87 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from commands import rankcvs
+from utils.uploads import UploadRejected
+
+PDF = b"%PDF-1.4\n" + b"0" * 100
+
+
+def make_zip(entries) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_unzip_keeps_only_pdfs():
+    data = make_zip([
+        ("a.pdf", PDF),
+        ("fake.pdf", b"MZ not a pdf"),
+        ("notes.txt", PDF),
+        ("__MACOSX/._a.pdf", PDF),
+    ])
+    assert rankcvs._unzip_pdfs(data) == [("a.pdf", PDF)]
+
+
+def test_unzip_skips_entries_over_the_upload_limit(monkeypatch):
+    monkeypatch.setattr(rankcvs, "MAX_UPLOAD_BYTES", 1000)
+    data = make_zip([("big.pdf", b"%PDF" + b"0" * 2000), ("small.pdf", PDF)])
+    assert [name for name, _ in rankcvs._unzip_pdfs(data)] == ["small.pdf"]
+
+
+def test_unzip_skips_an_entry_larger_than_declared():
+    data = bytearray(make_zip([("bomb.pdf", b"%PDF" + b"0" * 5000), ("ok.pdf", PDF)]))
+    # Declare a tiny uncompressed size in the central directory
+    central = data.index(b"PK\x01\x02")
+    data[central + 24:central + 28] = (10).to_bytes(4, "little")
+    assert rankcvs._unzip_pdfs(bytes(data)) == [("ok.pdf", PDF)]
+
+
+def test_unzip_skips_entries_with_a_bad_crc_or_unsupported_compression():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("corrupt.pdf", PDF)
+        archive.writestr("method.pdf", PDF)
+        archive.writestr("ok.pdf", PDF)
+    data = bytearray(buffer.getvalue())
+    # Flip a byte of the first entry's stored data
+    data[data.index(PDF) + 20] ^= 0xFF
+    # Give the second entry an unknown compression method in both headers
+    local = data.index(b"PK\x03\x04", data.index(b"corrupt.pdf"))
+    central = data.index(b"PK\x01\x02")
+    central = data.index(b"PK\x01\x02", central + 4)
+    data[local + 8:local + 10] = data[central + 10:central + 12] = (99).to_bytes(2, "little")
+    assert rankcvs._unzip_pdfs(bytes(data)) == [("ok.pdf", PDF)]
+
+
+def test_unreadable_archive_keeps_the_cause():
+    with pytest.raises(UploadRejected) as excinfo:
+        rankcvs._unzip_pdfs(b"not a zip")
+    assert isinstance(excinfo.value.__cause__, zipfile.BadZipFile)
+
+
+def test_unzip_caps_the_total_size(monkeypatch):
+    monkeypatch.setattr(rankcvs, "MAX_UNZIPPED_BYTES", 250)
+    data = make_zip([(f"cv{i}.pdf", PDF) for i in range(3)])
+    with pytest.raises(UploadRejected):
+        rankcvs._unzip_pdfs(data)
+
+
+class Attachment:
+    def __init__(self, filename: str, data: bytes):
+        self.filename = filename
+        self.size = len(data)
+        self._data = data
+
+    async def read(self) -> bytes:
+        return self._data
+
+
+def test_collect_pdfs_checks_the_signature_of_attachments():
+    files = asyncio.run(rankcvs.collect_pdfs([Attachment("cv.pdf", PDF), Attachment("renamed.pdf", b"<html>")]))
+    assert files == [("cv.pdf", PDF)]
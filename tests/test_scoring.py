@@ -0,0 +1,54 @@
+import pytest
+
+from utils import scoring
+from utils.scoring import extract_contact_info, score_cv
+from utils.text_analyzer import analyze_cv
+
+CV_WITH_DATES = (
+    "Experience\n"
+    "Software Engineer (2018-2020)\n"
+    "Analyst 2016 2018, handled 1200 3400 tickets\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def no_grammar_errors(monkeypatch):
+    # LanguageTool is slow to start and not needed to check the score rules
+    monkeypatch.setattr(scoring, "count_grammar_errors", lambda text: 0)
+
+
+def test_date_ranges_do_not_earn_the_phone_bonus():
+    features = analyze_cv(CV_WITH_DATES)
+    assert not features.has_long_number
+    assert score_cv(CV_WITH_DATES) == 20
+    assert score_cv(CV_WITH_DATES + "Phone: 5551234567\n") == 25
+
+
+def test_contact_extraction_keeps_the_loose_phone_pattern():
+    # Same pattern as before the analyzer; \b cannot match before the "+"
+    assert extract_contact_info("Call +1 555-123-4567")["phone"] == "1 555-123-4567"
+
+
+def test_email_bonus_uses_the_plain_pattern():
+    assert score_cv("Experience\nmail: jane@example.com\n") == 25
+    # The baseline pattern needs word characters on both sides of the dot
+    assert score_cv("Experience\nmail: jane@my-site.com\n") == 20
+
+
+def test_format_check_counts_any_dash_or_asterisk():
+    features = analyze_cv("Skills\nPython*\nSQL-Server\n")
+    assert features.has_bullet_chars
+    assert not features.has_bullets
+
+
+def test_labels_match_the_per_keyword_scans():
+    features = analyze_cv("EDUCATION\nWork History\n• Won an Award\nLinkedIn.com/in/jane\n")
+    assert features.sections == ("education", "experience")
+    assert features.has_achievements and features.has_bullets and features.mentions_linkedin
+    assert not features.has_summary
+
+
+def test_long_number_needs_word_boundaries():
+    assert analyze_cv("call 5551234567 now").has_long_number
+    assert not analyze_cv("id x5551234567 or 5551234567x").has_long_number
+    assert not analyze_cv("555123456").has_long_number
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from utils.skill_matching import MATCH_THRESHOLD, canonicalize, match_skills, similarity
+
+
+@pytest.mark.parametrize("raw", ["Python 3", "python3", "Python", "python programming", "Python (3.11)"])
+def test_python_variants_canonicalize_to_python(raw):
+    assert canonicalize(raw) == "python"
+
+
+@pytest.mark.parametrize("a, b", [
+    ("java", "javascript"),
+    ("sql", "nosql"),
+    ("sql", "mysql"),
+    ("c", "c++"),
+    ("go", "Google Ads"),
+])
+def test_prefix_skills_are_distinct(a, b):
+    # A CV listing a does not satisfy a job asking for b
+    assert canonicalize(a) != canonicalize(b)
+    assert match_skills([b], [a])[1] == {}
+    assert similarity([canonicalize(a)], [canonicalize(b)])[0, 0] < MATCH_THRESHOLD
+
+
+def test_specific_database_implies_sql_but_not_the_reverse():
+    assert match_skills(["sql"], ["MySQL"])[1] == {"sql": "sql"}
+    assert match_skills(["sql"], ["NoSQL"])[1] == {}
+    assert match_skills(["mysql"], ["sql"])[1] == {}
+
+
+def test_threshold_boundary():
+    assert MATCH_THRESHOLD == 0.75
+    score = float(similarity(["kubernetes"], ["kubernete"])[0, 0])
+    assert score >= MATCH_THRESHOLD
+    # A match needs a similarity of at least the threshold, inclusive
+    assert match_skills(["kubernetes"], ["kubernete"], threshold=score)[1] == {"kubernetes": "kubernete"}
+    assert match_skills(["kubernetes"], ["kubernete"], threshold=np.nextafter(score, 1.0))[1] == {}
+    # Just above and just below the default
+    assert match_skills(["Spring Boot"], ["SpringBoot"])[1] == {"spring boot": "springboot"}
+    assert match_skills(["data analysis"], ["data analytics"])[1] == {}
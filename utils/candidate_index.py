@@ -0,0 +1,172 @@
+"""
+Persistent index of analyzed CVs.
+
+Every CV whose skills were extracted (by !cvmatch or !rankcvs) is stored per
+guild with its normalized skills, contact info, score and document key, together
+with an inverted index from skill to candidate. Skills are stored in canonical
+form, so a job description can be matched (fuzzily, see utils.skill_matching)
+against the whole stored pool without any LLM calls on the CV side.
+
+A candidate is identified by the email found in the CV, so re-uploading an
+edited CV replaces that candidate's entry. Without an email, the identity is a
+hash of the normalized extracted text: a re-upload or re-export of the same CV
+updates its entry, while an edited CV is a new candidate.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from utils import skill_matching
+from utils.text_analyzer import analyze_cv
+
+DATA_DIR = os.environ.get("CVBOT_DATA_DIR", "data")
+
+_db: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _get_db() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _db = sqlite3.connect(os.path.join(DATA_DIR, "candidates.sqlite3"), check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                guild_id INTEGER NOT NULL,
+                candidate_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                doc TEXT NOT NULL,
+                email TEXT,
+                phone TEXT,
+                linkedin TEXT,
+                score INTEGER,
+                skill_count INTEGER NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (guild_id, candidate_id)
+            );
+            CREATE TABLE IF NOT EXISTS candidate_skills (
+                guild_id INTEGER NOT NULL,
+                skill TEXT NOT NULL,
+                candidate_id TEXT NOT NULL,
+                PRIMARY KEY (guild_id, skill, candidate_id)
+            );
+            CREATE INDEX IF NOT EXISTS candidate_skills_by_candidate
+                ON candidate_skills (guild_id, candidate_id);
+            """
+        )
+        _db.commit()
+    return _db
+
+
+def text_key(cv_text: str) -> str:
+    """
+    Hash of the extracted text with case and whitespace normalized. Unlike
+    cv_cache.document_key(), it does not change when the same CV is exported
+    to a new PDF.
+    """
+    normalized = " ".join(cv_text.lower().split())
+    return "text:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def index_candidate(guild_id: int, name: str, doc: str, cv_text: str,
+                    skills: Iterable[str], score: Optional[int] = None) -> str:
+    """
+    Add or update a candidate and their skills.
+    Args:
+        guild_id (int): Guild the CV was uploaded in (0 for direct messages).
+        name (str): Display name, usually the file name.
+        doc (str): PDF hash from cv_cache.document_key().
+        cv_text (str): The extracted CV text (for contact info).
+        skills: Skills extracted from the CV.
+        score (int, optional): CV score, if already computed.
+    Returns:
+        str: The candidate id.
+    """
+    features = analyze_cv(cv_text)
+    candidate_id = (features.email or "").lower() or text_key(cv_text)
+    normalized = skill_matching.canonical_skills(skills, implied=True)
+    with _lock:
+        db = _get_db()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO candidates "
+                "(guild_id, candidate_id, name, doc, email, phone, linkedin, score, skill_count, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (guild_id, candidate_id, name, doc, features.email, features.phone,
+                 features.linkedin, score, len(normalized), time.time()),
+            )
+            # Replace only this candidate's postings in the inverted index
+            db.execute(
+                "DELETE FROM candidate_skills WHERE guild_id = ? AND candidate_id = ?",
+                (guild_id, candidate_id),
+            )
+            db.executemany(
+                "INSERT INTO candidate_skills (guild_id, skill, candidate_id) VALUES (?, ?, ?)",
+                [(guild_id, skill, candidate_id) for skill in normalized],
+            )
+    return candidate_id
+
+
+def search(guild_id: int, job_skills: Iterable[str], limit: int = 10) -> List[dict]:
+    """
+    Rank stored candidates of a guild by how many of the job skills they have.
+    Returns:
+        list: Dicts with candidate fields, "match" (percent) and "common" skills,
+        best match first.
+    """
+    with _lock:
+        db = _get_db()
+        vocabulary = [row[0] for row in db.execute(
+            "SELECT DISTINCT skill FROM candidate_skills WHERE guild_id = ?", (guild_id,)
+        )]
+        # Stored skills that fuzzily match a job skill -> that job skill
+        wanted = skill_matching.expand(job_skills, vocabulary)
+        if not wanted:
+            return []
+        placeholders = ",".join("?" * len(wanted))
+        rows = db.execute(
+            f"SELECT candidate_id, skill FROM candidate_skills "
+            f"WHERE guild_id = ? AND skill IN ({placeholders})",
+            (guild_id, *wanted),
+        ).fetchall()
+
+        hits: dict = {}
+        for candidate_id, skill in rows:
+            hits.setdefault(candidate_id, set()).add(wanted[skill])
+        best = sorted(hits, key=lambda c: len(hits[c]), reverse=True)[:limit]
+        details = {
+            row[0]: row
+            for row in db.execute(
+                f"SELECT candidate_id, name, email, phone, linkedin, score FROM candidates "
+                f"WHERE guild_id = ? AND candidate_id IN ({','.join('?' * len(best))})",
+                (guild_id, *best),
+            )
+        }
+
+    job_count = len(skill_matching.canonical_skills(job_skills))
+    results = []
+    for candidate_id in best:
+        _, name, email, phone, linkedin, score = details[candidate_id]
+        results.append({
+            "candidate_id": candidate_id,
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "linkedin": linkedin,
+            "score": score,
+            "match": len(hits[candidate_id]) / job_count * 100,
+            "common": hits[candidate_id],
+        })
+    return results
+
+
+def candidate_count(guild_id: int) -> int:
+    with _lock:
+        return _get_db().execute(
+            "SELECT COUNT(*) FROM candidates WHERE guild_id = ?", (guild_id,)
+        ).fetchone()[0]
@@ -0,0 +1,72 @@
+"""
+Content-addressed cache for uploaded CVs.
+
+Entries are keyed on the SHA-256 of the PDF bytes. Each entry holds the
+extracted text and, filled in lazily by the commands that need them, derived
+results such as contact info, score, summary and LLM skills. A small
+in-memory LRU sits in front of an on-disk SQLite tier that is trimmed by size.
+"""
+import hashlib
+import os
+from typing import Any, Awaitable, Callable
+
+from utils.executors import run_blocking
+from utils.tiered_cache import TieredCache
+
+CACHE_DIR = os.environ.get("CVBOT_CACHE_DIR", "cache")
+MEMORY_ENTRIES = int(os.environ.get("CVBOT_CV_CACHE_ENTRIES", 256))
+DISK_MAX_BYTES = int(os.environ.get("CVBOT_CV_CACHE_MAX_BYTES", 200 * 2**20))
+# Bump when extraction or analysis changes so stale results are not served
+CACHE_VERSION = 6
+
+_cache = TieredCache(
+    os.path.join(CACHE_DIR, f"cv_cache_v{CACHE_VERSION}.sqlite3"), MEMORY_ENTRIES, DISK_MAX_BYTES
+)
+
+
+def document_key(data: bytes) -> str:
+    """
+    Return the cache key (SHA-256 hex digest) for the given PDF bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def get(doc: str, name: str) -> Any:
+    """
+    Look up a cached value for a document.
+    Args:
+        doc (str): Document key from document_key().
+        name (str): What is cached, e.g. "text", "contact", "score", "summary", "skills".
+    Returns:
+        The cached value, or None if it is not cached.
+    """
+    return _cache.get(f"{doc}/{name}")
+
+
+def put(doc: str, name: str, value: Any) -> None:
+    """
+    Store a JSON-serializable value for a document in both tiers.
+    """
+    _cache.put(f"{doc}/{name}", value)
+
+
+async def get_or_compute(doc: str, name: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return the cached value for (doc, name), computing and storing it on a miss.
+    Args:
+        doc (str): Document key from document_key().
+        name (str): Name of the cached result.
+        compute: Coroutine function producing the value when it is not cached.
+    """
+    value = await run_blocking(get, doc, name)
+    if value is None:
+        value = await compute()
+        await run_blocking(put, doc, name, value)
+    return value
+
+
+def cache_stats() -> dict:
+    """
+    Return hit/miss counters for both tiers.
+    """
+    return _cache.stats()
@@ -1,18 +1,150 @@
+"""
+PDF text extraction.
+
+Pages are extracted one at a time by ``iter_page_texts`` so callers can stop
+as soon as they have enough text. The fast path uses pypdfium2 (optional,
+``pip install pypdfium2``), which reads the text layer without analysing the
+page layout; a page is re-read with pdfplumber only when pdfium returns no
+text or mostly unmappable glyphs for it. Without pypdfium2, or with
+CVBOT_PDF_ENGINE=pdfplumber, every page goes through pdfplumber.
+"""
+import io
+import os
+from typing import IO, Iterator, Optional, Union
+
 import pdfplumber
-from typing import Union, IO
 
-def extract_text_from_pdf(file: Union[str, IO]) -> str:
+try:
+    import pypdfium2
+except ImportError:  # optional speed-up
+    pypdfium2 = None
+
+# "auto" (pdfium with pdfplumber fallback) or "pdfplumber"
+PDF_ENGINE = os.environ.get("CVBOT_PDF_ENGINE", "auto")
+# Share of U+FFFD / (cid:..) glyphs above which pdfium's page text is not trusted
+MAX_UNMAPPED_SHARE = 0.05
+
+Source = Union[str, bytes, IO]
+
+
+class PageLimitExceeded(ValueError):
+    """
+    Raised when a PDF has more pages than the caller allows.
+    """
+    def __init__(self, pages: int, max_pages: int):
+        super().__init__(pages, max_pages)
+        self.pages = pages
+        self.max_pages = max_pages
+
+
+def _rewind(file: Source) -> Source:
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file
+
+
+def _plumber_source(file: Source) -> Union[str, IO]:
+    return io.BytesIO(file) if isinstance(file, bytes) else _rewind(file)
+
+
+def _usable(text: str) -> bool:
+    if not text.strip():
+        return False
+    unmapped = text.count("\ufffd") + text.count("(cid:")
+    return unmapped <= MAX_UNMAPPED_SHARE * len(text)
+
+
+def _pdfium_text(page) -> str:
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range()
+    finally:
+        textpage.close()
+    # pdfium ends lines with \r\n and marks soft hyphens with \x02
+    return text.replace("\r\n", "\n").replace("\r", "\n").replace("\x02", "")
+
+
+def count_pages(file: Source) -> int:
+    """
+    Return the number of pages without extracting any text.
+    """
+    if pypdfium2 is not None and PDF_ENGINE != "pdfplumber":
+        pdf = pypdfium2.PdfDocument(_rewind(file))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with pdfplumber.open(_plumber_source(file)) as pdf:
+        return len(pdf.pages)
+
+
+def iter_page_texts(file: Source, start: int = 0, stop: Optional[int] = None,
+                    max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of pages ``start`` to ``stop`` (exclusive) one by one.
+    Args:
+        file: Path, bytes or file-like object of the PDF.
+        start (int): Index of the first page.
+        stop (int, optional): Index after the last page; defaults to the end.
+        max_pages (int, optional): Refuse documents with more pages than this.
+    Raises:
+        PageLimitExceeded: Before the first page, if the PDF has more than max_pages pages.
+    """
+    plumber = None
+    pdf = None
+    try:
+        if pypdfium2 is not None and PDF_ENGINE != "pdfplumber":
+            pdf = pypdfium2.PdfDocument(_rewind(file))
+            pages = len(pdf)
+        else:
+            plumber = pdfplumber.open(_plumber_source(file))
+            pages = len(plumber.pages)
+        if max_pages is not None and pages > max_pages:
+            raise PageLimitExceeded(pages, max_pages)
+        for index in range(start, min(stop if stop is not None else pages, pages)):
+            text = ""
+            if pdf is not None:
+                page = pdf[index]
+                try:
+                    text = _pdfium_text(page)
+                finally:
+                    page.close()
+            if not _usable(text):
+                # Scanned-looking or badly encoded page: let pdfplumber lay it out
+                if plumber is None:
+                    plumber = pdfplumber.open(_plumber_source(file))
+                text = plumber.pages[index].extract_text(x_tolerance=1, y_tolerance=1) or ""
+                plumber.pages[index].close()
+            yield text
+    finally:
+        if pdf is not None:
+            pdf.close()
+        if plumber is not None:
+            plumber.close()
+
+
+def extract_text_from_pdf(file: Source, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                          start: int = 0, stop: Optional[int] = None) -> str:
     """
     Extract text from a PDF file or file-like object.
     Args:
-        file (str or file-like): Path to the PDF file or a file-like object.
+        file (str, bytes or file-like): Path to the PDF file, its bytes or a file-like object.
+        max_pages (int, optional): Refuse documents with more pages than this.
+        max_chars (int, optional): Stop reading pages once this much text has been extracted;
+            the result is cut to this length.
+        start, stop (int, optional): Only extract this range of pages.
     Returns:
         str: Extracted text from the PDF, preserving spaces and line breaks.
+    Raises:
+        PageLimitExceeded: If the PDF has more than max_pages pages.
     """
-    text = ""
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text(x_tolerance=1, y_tolerance=1)
-            if page_text:
-                text += page_text + "\n"
-    return text
+    parts = []
+    length = 0
+    for page_text in iter_page_texts(file, start, stop, max_pages):
+        if page_text:
+            parts.append(page_text + "\n")
+            length += len(page_text) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
@@ -0,0 +1,133 @@
+"""
+Execution layer for the blocking work done by commands.
+
+Nothing slow may run directly on the discord.py event loop. Commands hand
+their work to one of the pools below instead:
+
+- ``pdf``: a process pool for CPU-heavy PDF parsing (pdfplumber holds the GIL).
+- ``inference``: a small thread pool for model calls, sized so only a few
+  models run at once.
+- ``blocking``: a thread pool for other blocking calls (grammar checks, HTML parsing).
+
+Each pool tracks how many tasks are waiting and running, and how long they
+waited, so ``pool_stats()`` shows where the time goes.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+POOL_SIZES = {
+    "pdf": int(os.environ.get("CVBOT_PDF_WORKERS", max(1, min(4, (os.cpu_count() or 2) // 2)))),
+    "inference": int(os.environ.get("CVBOT_INFERENCE_WORKERS", 1)),
+    "blocking": int(os.environ.get("CVBOT_BLOCKING_WORKERS", 4)),
+}
+
+# Log a warning when a task waited longer than this many seconds for a worker
+SLOW_QUEUE_SECONDS = 5.0
+
+_pools: Dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+_stats = {
+    name: {"in_flight": 0, "completed": 0, "failed": 0, "wait_seconds": 0.0, "run_seconds": 0.0}
+    for name in POOL_SIZES
+}
+
+
+def _get_pool(name: str) -> Executor:
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                if name == "pdf":
+                    # spawn: workers must not inherit model threads or locks from the bot
+                    pool = ProcessPoolExecutor(
+                        max_workers=POOL_SIZES[name],
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    pool = ThreadPoolExecutor(max_workers=POOL_SIZES[name], thread_name_prefix=name)
+                _pools[name] = pool
+    return pool
+
+
+def _timed_call(func: Callable, args: Tuple, kwargs: dict) -> Tuple[float, float, Any]:
+    # Runs inside the worker; wall-clock times are comparable across processes.
+    started = time.time()
+    result = func(*args, **kwargs)
+    return started, time.time(), result
+
+
+async def run_in_pool(pool_name: str, func: Callable, *args, **kwargs) -> Any:
+    """
+    Run ``func(*args, **kwargs)`` on the named pool without blocking the event loop.
+    Args:
+        pool_name (str): "pdf", "inference" or "blocking".
+        func: The callable; for "pdf" it must be picklable (a module-level function).
+    Returns:
+        Whatever ``func`` returns.
+    """
+    stats = _stats[pool_name]
+    loop = asyncio.get_running_loop()
+    submitted = time.time()
+    stats["in_flight"] += 1
+    try:
+        started, finished, result = await loop.run_in_executor(
+            _get_pool(pool_name), functools.partial(_timed_call, func, args, kwargs)
+        )
+    except Exception:
+        stats["failed"] += 1
+        raise
+    finally:
+        stats["in_flight"] -= 1
+
+    waited = max(0.0, started - submitted)
+    stats["completed"] += 1
+    stats["wait_seconds"] += waited
+    stats["run_seconds"] += finished - started
+    if waited > SLOW_QUEUE_SECONDS:
+        logging.warning(
+            "%s waited %.1fs in the %s pool (%d in flight)",
+            getattr(func, "__name__", func), waited, pool_name, stats["in_flight"],
+        )
+    return result
+
+
+async def run_pdf(func: Callable, *args, **kwargs) -> Any:
+    return await run_in_pool("pdf", func, *args, **kwargs)
+
+
+async def run_inference(func: Callable, *args, **kwargs) -> Any:
+    return await run_in_pool("inference", func, *args, **kwargs)
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    return await run_in_pool("blocking", func, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, dict]:
+    """
+    Return per-pool counters, including the current queue depth
+    (tasks waiting for a free worker).
+    """
+    result = {}
+    for name, stats in _stats.items():
+        result[name] = dict(
+            stats,
+            workers=POOL_SIZES[name],
+            queue_depth=max(0, stats["in_flight"] - POOL_SIZES[name]),
+        )
+    return result
+
+
+def shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
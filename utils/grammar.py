@@ -0,0 +1,142 @@
+"""
+Long-lived grammar checking backend shared by every command.
+
+LanguageTool is started once per process (or reached over HTTP when
+CVBOT_LANGUAGETOOL_URL points at a server shared by several bot processes),
+and results are cached per normalized sentence so that re-uploads of a
+lightly edited CV only pay for the sentences that changed.
+"""
+import atexit
+import bisect
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+# e.g. "http://localhost:8081" to share one LanguageTool server between processes
+LANGUAGETOOL_URL = os.environ.get("CVBOT_LANGUAGETOOL_URL", "")
+CACHE_SIZE = int(os.environ.get("CVBOT_GRAMMAR_CACHE_SIZE", 20000))
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+_SEPARATOR = "\n\n"
+
+_tool = None
+_tool_lock = threading.Lock()
+_check_lock = threading.Lock()
+_cache: "OrderedDict[str, int]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def get_tool():
+    """
+    Return the process-wide LanguageTool instance, starting it on first use.
+    """
+    global _tool
+    if _tool is None:
+        with _tool_lock:
+            if _tool is None:
+                import language_tool_python
+
+                if LANGUAGETOOL_URL:
+                    _tool = language_tool_python.LanguageTool('en-US', remote_server=LANGUAGETOOL_URL)
+                    logging.info("Using LanguageTool server at %s", LANGUAGETOOL_URL)
+                else:
+                    _tool = language_tool_python.LanguageTool('en-US')
+                    logging.info("Started local LanguageTool server")
+    return _tool
+
+
+@atexit.register
+def close_tool() -> None:
+    global _tool
+    with _tool_lock:
+        if _tool is not None:
+            try:
+                _tool.close()
+            except Exception:
+                pass
+            _tool = None
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into normalized (whitespace-collapsed) non-empty sentences.
+    """
+    sentences = (" ".join(s.split()) for s in _SENTENCE_SPLIT.split(text))
+    return [s for s in sentences if s]
+
+
+def _sentence_key(sentence: str) -> str:
+    return hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+
+
+def _check_sentences(sentences: List[str]) -> Dict[str, int]:
+    """
+    Run LanguageTool once over all given sentences and attribute each
+    match back to the sentence it falls in.
+    """
+    starts = []
+    offset = 0
+    for sentence in sentences:
+        starts.append(offset)
+        offset += len(sentence) + len(_SEPARATOR)
+
+    tool = get_tool()
+    if LANGUAGETOOL_URL:
+        matches = tool.check(_SEPARATOR.join(sentences))
+    else:
+        with _check_lock:
+            matches = tool.check(_SEPARATOR.join(sentences))
+
+    counts = [0] * len(sentences)
+    for match in matches:
+        idx = bisect.bisect_right(starts, match.offset) - 1
+        if idx >= 0:
+            counts[idx] += 1
+    return {_sentence_key(s): n for s, n in zip(sentences, counts)}
+
+
+def count_grammar_errors(text: str) -> int:
+    """
+    Count grammar/spelling issues in the text, reusing cached results
+    for sentences that were checked before.
+    Args:
+        text (str): The text to check.
+    Returns:
+        int: Number of issues found.
+    """
+    sentences = split_sentences(text)
+    keys = [_sentence_key(s) for s in sentences]
+
+    known = {}
+    missing = {}
+    with _cache_lock:
+        for key, sentence in zip(keys, sentences):
+            if key in _cache:
+                _cache.move_to_end(key)
+                known[key] = _cache[key]
+                _cache_stats["hits"] += 1
+            elif key not in missing:
+                missing[key] = sentence
+                _cache_stats["misses"] += 1
+
+    if missing:
+        checked = _check_sentences(list(missing.values()))
+        known.update(checked)
+        with _cache_lock:
+            for key, count in checked.items():
+                _cache[key] = count
+                _cache.move_to_end(key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return sum(known[key] for key in keys)
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        return dict(_cache_stats, size=len(_cache), max_size=CACHE_SIZE)
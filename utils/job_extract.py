@@ -0,0 +1,185 @@
+"""
+Main-content extraction for job board pages.
+
+Structured data wins when present: if the page embeds a schema.org
+``JobPosting`` in JSON-LD, its title and description are used directly.
+Otherwise the page is parsed once, navigation, cookie banners and other
+boilerplate are dropped, and the amount of non-link text under every block is
+totalled in a single sweep. The smallest block holding most of that text wins
+and only it is turned into text.
+
+The HTML parser is pluggable: ``lxml`` is used when installed, otherwise the
+standard library ``html.parser``; CVBOT_HTML_PARSER overrides the choice.
+"""
+import html as html_lib
+import json
+import os
+import re
+from typing import Callable, Dict, Iterable, Optional
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import Comment
+
+
+def _default_parser() -> str:
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+HTML_PARSER = os.environ.get("CVBOT_HTML_PARSER") or _default_parser()
+MIN_CONTENT_CHARS = 200
+# A child block replaces its parent when it holds at least this share of the text
+DOMINANT_SHARE = 0.6
+
+_JSON_LD = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+_TAGS = re.compile(r'<[^>]+>')
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form", "button", "iframe"}
+# Matched against the start of each class name and the id
+_BOILERPLATE = re.compile(r'cookie|consent|banner|gdpr|nav|menu|footer|header|sidebar|modal|popup|share|social|breadcrumb', re.IGNORECASE)
+_BLOCK_TAGS = {"article", "main", "section", "div", "td", "body"}
+
+# name -> callable(html) -> text; see register_backend()
+_backends: Dict[str, Callable[[str], str]] = {}
+
+
+def register_backend(name: str, extractor: Callable[[str], str]) -> None:
+    """
+    Register an alternative extractor (e.g. one built on a faster parser).
+    Select it with extract_job_description(html, backend=name).
+    """
+    _backends[name] = extractor
+
+
+def _iter_job_postings(data) -> Iterable[dict]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_job_postings(item)
+    elif isinstance(data, dict):
+        types = data.get("@type")
+        if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+            yield data
+        if "@graph" in data:
+            yield from _iter_job_postings(data["@graph"])
+
+
+def extract_json_ld_job(html: str) -> Optional[str]:
+    """
+    Return title and description of an embedded JSON-LD JobPosting, if any.
+    """
+    for block in _JSON_LD.findall(html):
+        try:
+            data = json.loads(block.strip())
+        except ValueError:
+            continue
+        for posting in _iter_job_postings(data):
+            description = posting.get("description")
+            if not isinstance(description, str):
+                continue
+            # Descriptions are usually HTML (sometimes entity-escaped twice)
+            text = _TAGS.sub(" ", html_lib.unescape(html_lib.unescape(description)))
+            text = " ".join(text.split())
+            title = posting.get("title")
+            if isinstance(title, str) and title.strip():
+                text = f"{title.strip()}: {text}"
+            if text:
+                return text
+    return None
+
+
+def _is_boilerplate(tag) -> bool:
+    if tag.name in _SKIP_TAGS:
+        return True
+    attrs = tag.attrs or {}
+    if attrs.get("role") in ("navigation", "banner", "contentinfo", "dialog"):
+        return True
+    if attrs.get("aria-hidden") == "true" or "hidden" in attrs:
+        return True
+    classes = attrs.get("class") or []
+    if isinstance(classes, str):
+        classes = classes.split()
+    markers = list(classes) + [attrs.get("id") or ""]
+    return any(_BOILERPLATE.match(marker) for marker in markers if marker)
+
+
+def extract_by_density(html: str, parser: Optional[str] = None) -> str:
+    """
+    Parse the page once, total up the non-link text under every block, and
+    return the text of the smallest block that still holds most of it.
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+
+    for tag in [t for t in soup.find_all(True) if _is_boilerplate(t)]:
+        if not tag.decomposed:
+            tag.decompose()
+
+    def enclosing_block(node):
+        # Returns the nearest block above node and whether a link lies in between
+        parent, in_link = node.parent, False
+        while parent is not None and parent.name not in _BLOCK_TAGS:
+            in_link = in_link or parent.name == "a"
+            parent = parent.parent
+        return (parent if parent is not None else soup), in_link
+
+    # One walk over the tree: credit each text node to its nearest block
+    totals: Dict[int, int] = {id(soup): 0}
+    blocks = []
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            if isinstance(node, Comment):
+                continue
+            length = len(node.strip())
+            if not length:
+                continue
+            block, in_link = enclosing_block(node)
+            if not in_link:
+                totals[id(block)] += length
+        elif node.name in _BLOCK_TAGS:
+            blocks.append(node)
+            totals[id(node)] = 0
+
+    # Children come after their parents in document order, so a reverse
+    # sweep rolls every block's total up into its enclosing block.
+    children: Dict[int, list] = {}
+    for block in reversed(blocks):
+        parent, in_link = enclosing_block(block)
+        if not in_link:
+            totals[id(parent)] += totals[id(block)]
+            children.setdefault(id(parent), []).append(block)
+
+    # Descend while a single child block holds most of the text
+    best = soup
+    while children.get(id(best)):
+        child = max(children[id(best)], key=lambda b: totals[id(b)])
+        if totals[id(child)] < DOMINANT_SHARE * totals[id(best)]:
+            break
+        best = child
+
+    text = best.get_text(separator=' ', strip=True)
+    if len(text) >= MIN_CONTENT_CHARS:
+        return text
+    # Fallback: return all visible text
+    return soup.get_text(separator=' ', strip=True)
+
+
+def extract_job_description(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extract the job description from a job board page.
+    Args:
+        html (str): The page HTML.
+        backend (str, optional): Name of a registered extractor to use instead
+            of the built-in density extractor.
+    Returns:
+        str: The job description text.
+    """
+    structured = extract_json_ld_job(html)
+    if structured and len(structured) >= MIN_CONTENT_CHARS:
+        return structured
+    if backend:
+        return _backends[backend](html)
+    return extract_by_density(html)
@@ -0,0 +1,137 @@
+"""
+Shared fetcher for job board pages.
+
+Pages are fetched over one pooled aiohttp session and the extracted job
+description is cached per URL for CACHE_TTL seconds. Stale entries are
+revalidated with ETag / Last-Modified, and concurrent fetches of the same URL
+share a single request.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import aiohttp
+
+from utils import metrics
+from utils.executors import run_blocking
+from utils.job_extract import extract_job_description
+
+CACHE_TTL = float(os.environ.get("CVBOT_JOB_CACHE_TTL", 6 * 3600))
+CACHE_SIZE = int(os.environ.get("CVBOT_JOB_CACHE_SIZE", 512))
+REQUEST_TIMEOUT = 10
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; CVHelperBot/1.0)"}
+
+_session: Optional[aiohttp.ClientSession] = None
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_inflight: Dict[str, asyncio.Future] = {}
+_stats = {"hits": 0, "revalidated": 0, "misses": 0, "collapsed": 0, "errors": 0}
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared HTTP session, creating it on first use.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+        )
+    return _session
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _store(url: str, entry: dict) -> None:
+    _cache[url] = entry
+    _cache.move_to_end(url)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def _fetch(url: str) -> str:
+    with metrics.span("fetch_url"):
+        return await _fetch_page(url)
+
+
+async def _fetch_page(url: str) -> str:
+    entry = _cache.get(url)
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    async with get_session().get(url, headers=headers) as resp:
+        if resp.status == 304 and entry is not None:
+            _stats["revalidated"] += 1
+            entry["fetched_at"] = time.monotonic()
+            _store(url, entry)
+            return entry["text"]
+        resp.raise_for_status()
+        html = await resp.text()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+    _stats["misses"] += 1
+    # HTML parsing is CPU-bound, keep it off the event loop
+    text = await run_blocking(extract_job_description, html)
+    _store(url, {
+        "text": text,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.monotonic(),
+    })
+    return text
+
+
+async def fetch_job_description_from_url(url: str) -> str:
+    """
+    Fetch a job board page and return its main text.
+    Args:
+        url (str): The job posting URL.
+    Returns:
+        str: The job description, or an "[Error fetching job description: ...]" string.
+    """
+    entry = _cache.get(url)
+    if entry is not None and time.monotonic() - entry["fetched_at"] < CACHE_TTL:
+        _cache.move_to_end(url)
+        _stats["hits"] += 1
+        return entry["text"]
+
+    fut = _inflight.get(url)
+    if fut is not None:
+        _stats["collapsed"] += 1
+    else:
+        fut = asyncio.ensure_future(_fetch(url))
+        _inflight[url] = fut
+
+        def done(f: asyncio.Future) -> None:
+            _inflight.pop(url, None)
+            if not f.cancelled():
+                f.exception()  # mark retrieved even if every caller gave up
+
+        fut.add_done_callback(done)
+    try:
+        # shield: one caller giving up must not cancel the fetch for the others
+        return await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _stats["errors"] += 1
+        logging.warning("Failed to fetch job description from %s: %s", url, e)
+        return f"[Error fetching job description: {e}]"
+
+
+def cache_stats() -> dict:
+    return dict(_stats, size=len(_cache), in_flight=len(_inflight))
@@ -0,0 +1,44 @@
+"""
+Process-wide logging setup.
+
+Log records are put on an in-memory queue by a QueueHandler and written to
+disk by a QueueListener thread, so logging from a command never blocks the
+event loop on file I/O. Call configure_logging() once at startup instead of
+logging.basicConfig in individual modules.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+LOG_FILE = os.environ.get("CVBOT_LOG_FILE", os.path.join("logs", "bot.log"))
+LOG_LEVEL = os.environ.get("CVBOT_LOG_LEVEL", "INFO")
+LOG_FORMAT = '%(asctime)s %(levelname)s:%(name)s: %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(path: Optional[str] = LOG_FILE, level: str = LOG_LEVEL) -> None:
+    """
+    Route the root logger through a queue to a file (or stderr when path is None).
+    Calling it again has no effect.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        target = logging.FileHandler(path, encoding="utf-8")
+    else:
+        target = logging.StreamHandler()
+    target.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,253 @@
+"""
+Timings and counters in the Prometheus text format.
+
+Every stage of a command (download, extract, summarize, score, LLM generate,
+fetch URL, Discord sends) runs inside ``span(stage)``, which records its
+duration in a histogram labelled with the stage and the command that started
+it. Outcomes, timeouts and errors are counted, and the counters kept by the
+caches, worker pools and scheduler, the models' load time and memory and the
+process RSS are exported when the endpoint is scraped.
+
+The metrics are served on ``/metrics`` at CVBOT_METRICS_PORT (disabled when
+unset). With CVBOT_PROFILE_COMMANDS set, selected command invocations are
+profiled with pyinstrument (a sampling profiler, installed separately) and
+the reports are written to PROFILE_DIR.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+METRICS_HOST = os.environ.get("CVBOT_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("CVBOT_METRICS_PORT", 0))
+# Seconds; covers Discord sends (ms) up to cold model loads (minutes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+PROFILE_COMMANDS = {c.strip() for c in os.environ.get("CVBOT_PROFILE_COMMANDS", "").split(",") if c.strip()}
+# Fraction of invocations of those commands that are profiled
+PROFILE_RATE = float(os.environ.get("CVBOT_PROFILE_RATE", 1.0))
+PROFILE_DIR = os.environ.get("CVBOT_PROFILE_DIR", os.path.join("logs", "profiles"))
+
+_lock = threading.Lock()
+_registry: list = []
+_command: contextvars.ContextVar = contextvars.ContextVar("command", default="none")
+_collectors: List[Callable[[], Iterable[Tuple[str, str, dict, float]]]] = []
+_runner: Optional[web.AppRunner] = None
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(dict(key))} {_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._values: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            entry = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            for key, entry in sorted(self._values.items()):
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_labels(dict(labels, le=f'{bound:g}'))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(dict(labels, le='+Inf'))} {entry[-1]}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {_value(entry[-2])}")
+                lines.append(f"{self.name}_count{_labels(labels)} {entry[-1]}")
+        return lines
+
+
+def _value(value: float) -> str:
+    # Full precision: byte counts do not fit the 6 digits of "%g"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+STAGE_SECONDS = Histogram("cvbot_stage_seconds", "Duration of command stages.")
+STAGE_ERRORS = Counter("cvbot_stage_errors_total", "Command stages that raised.")
+COMMAND_SECONDS = Histogram("cvbot_command_seconds", "Duration of command invocations.")
+COMMANDS = Counter("cvbot_commands_total", "Command invocations by outcome.")
+TIMEOUTS = Counter("cvbot_timeouts_total", "Waits for a user reply that timed out.")
+
+
+def bind_command(name: str) -> None:
+    """
+    Attribute the spans of the current command invocation (and the tasks it starts) to ``name``.
+    """
+    _command.set(name)
+
+
+def current_command() -> str:
+    return _command.get()
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a stage of the current command, e.g. ``with metrics.span("extract"):``.
+    Works around ``await`` as well as plain code.
+    """
+    command = _command.get()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(command=command, stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, command=command, stage=stage)
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, dict, float]]]) -> None:
+    """
+    Add a function called at scrape time that yields ``(name, type, labels, value)``
+    for values other modules already keep, e.g. cache counters.
+    """
+    _collectors.append(collector)
+
+
+def _collect_runtime() -> Iterable[Tuple[str, str, dict, float]]:
+    # Imported here: these modules themselves record spans
+    from ai import generation_cache
+    from ai.models import _current_rss, model_stats
+    from utils import cv_cache, grammar, job_fetch
+    from utils.executors import pool_stats
+    from utils.scheduler import scheduler_stats
+
+    tiered = {"cv": cv_cache.cache_stats(), "generation": generation_cache.cache_stats()}
+    for cache, stats in tiered.items():
+        yield "cvbot_cache_hits_total", "counter", {"cache": cache}, stats["memory_hits"] + stats["disk_hits"]
+        yield "cvbot_cache_misses_total", "counter", {"cache": cache}, stats["misses"]
+    for cache, stats in (("grammar", grammar.cache_stats()), ("job_page", job_fetch.cache_stats())):
+        yield "cvbot_cache_hits_total", "counter", {"cache": cache}, stats["hits"] + stats.get("revalidated", 0)
+        yield "cvbot_cache_misses_total", "counter", {"cache": cache}, stats["misses"]
+    yield "cvbot_job_fetch_errors_total", "counter", {}, job_fetch.cache_stats()["errors"]
+    for pool, stats in pool_stats().items():
+        yield "cvbot_pool_queue_depth", "gauge", {"pool": pool}, stats["queue_depth"]
+        yield "cvbot_pool_failed_total", "counter", {"pool": pool}, stats["failed"]
+    for resource, stats in scheduler_stats().items():
+        yield "cvbot_scheduler_waiting", "gauge", {"resource": resource}, stats["waiting"]
+        yield "cvbot_scheduler_rejected_total", "counter", {"resource": resource}, stats["rejected"]
+    for model, stats in model_stats().items():
+        yield "cvbot_model_loaded", "gauge", {"model": model}, 1 if stats["loaded"] else 0
+        if "load_seconds" in stats:
+            # From the last load; the RSS is the growth of the process while loading
+            yield "cvbot_model_load_seconds", "gauge", {"model": model}, stats["load_seconds"]
+            yield "cvbot_model_rss_bytes", "gauge", {"model": model}, stats["rss_bytes"] if stats["loaded"] else 0
+    yield "cvbot_process_rss_bytes", "gauge", {}, _current_rss()
+
+
+_collectors.append(_collect_runtime)
+
+
+def render() -> str:
+    """
+    Return all metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    # Samples of one metric must be contiguous in the output
+    families: Dict[str, Tuple[str, list]] = {}
+    for collector in _collectors:
+        try:
+            samples = list(collector())
+        except Exception:
+            logging.exception("An error occurred while collecting metrics.")
+            continue
+        for name, kind, labels, value in samples:
+            families.setdefault(name, (kind, []))[1].append(f"{name}{_labels(labels)} {_value(value)}")
+    for name, (kind, samples) in families.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> None:
+    """
+    Serve /metrics on the running event loop. Does nothing when no port is configured.
+    """
+    global _runner
+    if not port or _runner is not None:
+        return
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    _runner = web.AppRunner(app)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    logging.info("Serving metrics on http://%s:%d/metrics", host, port)
+
+
+def start_profile(command: str):
+    """
+    Start a sampling profiler for this invocation of ``command`` if it is
+    selected for profiling. Returns the profiler, or None.
+    """
+    if command not in PROFILE_COMMANDS or random.random() >= PROFILE_RATE:
+        return None
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logging.warning("CVBOT_PROFILE_COMMANDS is set but pyinstrument is not installed.")
+        PROFILE_COMMANDS.clear()
+        return None
+    profiler = Profiler(async_mode="enabled")
+    profiler.start()
+    return profiler
+
+
+def stop_profile(profiler, command: str) -> None:
+    profiler.stop()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{command}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.output_text(unicode=True, show_all=False))
+    logging.info("Wrote profile of %s to %s", command, path)
@@ -0,0 +1,245 @@
+"""
+Central scheduler for the heavy work done by commands.
+
+Work on a shared resource (the LLM, the summarizer, the PDF workers, the
+grammar checker) first takes one of the resource's slots, so only a fixed
+number of jobs use it at once. Jobs that have to wait are served by weighted
+fair queuing: every guild gets a share of each resource in proportion to its
+weight, split evenly between the guild's users that are currently waiting, so
+one busy guild or user cannot starve the others.
+
+When a resource's queue is too long, or the estimated wait is above
+MAX_QUEUE_WAIT, new work is turned away with Overloaded. Callers that have to
+wait are told their queue position and estimated wait once per command.
+
+The requester (guild, user and how to notify them) is bound once per command
+invocation with bind(); the work submitted by that command, including tasks
+it starts, is attributed to it.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils import metrics
+from utils.executors import POOL_SIZES
+
+RESOURCE_LIMITS = {
+    "llm": int(os.environ.get("CVBOT_LLM_SLOTS", 8)),
+    "summarizer": int(os.environ.get("CVBOT_SUMMARIZER_SLOTS", 1)),
+    "pdf": int(os.environ.get("CVBOT_PDF_SLOTS", POOL_SIZES["pdf"])),
+    "grammar": int(os.environ.get("CVBOT_GRAMMAR_SLOTS", 2)),
+}
+RESOURCE_LABELS = {
+    "llm": "language model",
+    "summarizer": "summarizer",
+    "pdf": "PDF reader",
+    "grammar": "grammar checker",
+}
+# Initial guesses for the seconds one job holds a slot; refined as jobs finish
+SERVICE_SECONDS = {"llm": 5.0, "summarizer": 10.0, "pdf": 1.0, "grammar": 2.0}
+MAX_QUEUE_DEPTH = int(os.environ.get("CVBOT_MAX_QUEUE_DEPTH", 50))
+MAX_QUEUE_WAIT = float(os.environ.get("CVBOT_MAX_QUEUE_WAIT", 300))
+# e.g. CVBOT_GUILD_WEIGHTS=123456789:3,987654321:2 (other guilds weigh 1)
+GUILD_WEIGHTS = {
+    int(guild): float(weight)
+    for guild, weight in (
+        item.split(":") for item in os.environ.get("CVBOT_GUILD_WEIGHTS", "").split(",") if item.strip()
+    )
+}
+# Only notify users whose estimated wait is at least this many seconds
+NOTIFY_AFTER = 3.0
+
+
+class Overloaded(Exception):
+    """
+    Raised when a resource is too busy to accept more work.
+    The message is meant to be shown to the user.
+    """
+
+    def __init__(self, resource: str, eta: float):
+        self.resource = resource
+        self.eta = eta
+        super().__init__(
+            f"The bot is busy right now (the {RESOURCE_LABELS[resource]} queue is full, "
+            f"estimated wait {math.ceil(eta)} seconds). Please try again in a few minutes."
+        )
+
+
+@dataclass
+class Requester:
+    guild_id: Optional[int]
+    user_id: Optional[int]
+    notify: Optional[Callable[[str], Awaitable[Any]]] = None
+    notified: set = field(default_factory=set)
+
+    @property
+    def flow(self) -> tuple:
+        return self.guild_id, self.user_id
+
+
+_SYSTEM = Requester(None, None)
+_requester: contextvars.ContextVar = contextvars.ContextVar("requester", default=_SYSTEM)
+
+
+def bind(guild_id: Optional[int], user_id: Optional[int], notify=None) -> None:
+    """
+    Attribute the work of the current command (and the tasks it starts) to a requester.
+    Args:
+        guild_id: The guild, or None for direct messages.
+        user_id: The invoking user.
+        notify: Coroutine function called with a message for the user, e.g. ctx.send.
+    """
+    _requester.set(Requester(guild_id, user_id, notify))
+
+
+class _Resource:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.running = 0
+        self.waiting = []  # heap of (finish tag, seq, start tag, flow, future)
+        self.active = Counter()  # flow -> jobs waiting or running
+        self.last_finish: Dict[tuple, float] = {}
+        self.virtual_time = 0.0
+        self.service = SERVICE_SECONDS[name]
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "wait_seconds": 0.0}
+
+    def weight(self, flow: tuple) -> float:
+        guild_id = flow[0]
+        users = sum(1 for other in self.active if other[0] == guild_id) or 1
+        return GUILD_WEIGHTS.get(guild_id, 1.0) / users
+
+    def tag(self, flow: tuple) -> tuple:
+        start = max(self.virtual_time, self.last_finish.get(flow, 0.0))
+        finish = start + 1.0 / self.weight(flow)
+        self.last_finish[flow] = finish
+        return start, finish
+
+    def queued(self) -> int:
+        return sum(1 for entry in self.waiting if not entry[4].done())
+
+    def eta(self, position: int) -> float:
+        # Jobs ahead of us are served `limit` at a time; the running ones are about half done
+        return self.service * (position / self.limit + 0.5)
+
+    def dispatch(self) -> None:
+        while self.running < self.limit and self.waiting:
+            _, _, start, _, fut = heapq.heappop(self.waiting)
+            if fut.done():
+                continue
+            self.running += 1
+            self.virtual_time = max(self.virtual_time, start)
+            fut.set_result(None)
+        if len(self.last_finish) > 1000:
+            # Tags at or behind the virtual time carry no information
+            self.last_finish = {f: t for f, t in self.last_finish.items() if t > self.virtual_time}
+
+
+_resources = {name: _Resource(name, limit) for name, limit in RESOURCE_LIMITS.items()}
+_seq = itertools.count()
+
+
+def _forget(resource: _Resource, flow: tuple) -> None:
+    resource.active[flow] -= 1
+    if resource.active[flow] <= 0:
+        del resource.active[flow]
+
+
+async def _acquire(resource: _Resource, requester: Requester) -> None:
+    flow = requester.flow
+    resource.active[flow] += 1
+    if resource.running < resource.limit and not resource.queued():
+        # Immediate work still advances the flow's tags, so heavy users queue behind light ones
+        start, _ = resource.tag(flow)
+        resource.virtual_time = max(resource.virtual_time, start)
+        resource.running += 1
+        resource.stats["admitted"] += 1
+        return
+
+    start, finish = resource.tag(flow)
+    position = 1 + sum(1 for entry in resource.waiting if entry[0] <= finish and not entry[4].done())
+    eta = resource.eta(position)
+    queued = resource.queued()
+    if queued >= MAX_QUEUE_DEPTH or eta > MAX_QUEUE_WAIT:
+        resource.stats["rejected"] += 1
+        logging.warning("Rejected %s work for %s: %d queued, eta %.0fs", resource.name, flow, queued, eta)
+        _forget(resource, flow)
+        raise Overloaded(resource.name, eta)
+
+    fut = asyncio.get_running_loop().create_future()
+    heapq.heappush(resource.waiting, (finish, next(_seq), start, flow, fut))
+    resource.stats["queued"] += 1
+    if requester.notify and resource.name not in requester.notified and eta >= NOTIFY_AFTER:
+        requester.notified.add(resource.name)
+        asyncio.ensure_future(requester.notify(
+            f"⏳ You are #{position} in the queue for the {RESOURCE_LABELS[resource.name]} "
+            f"(about {math.ceil(eta)} seconds)."
+        ))
+    queued_at = time.monotonic()
+    try:
+        with metrics.span(f"queue_{resource.name}"):
+            await fut
+    except asyncio.CancelledError:
+        if fut.done() and not fut.cancelled():
+            # The slot was granted as we were cancelled; hand it on
+            resource.running -= 1
+            resource.dispatch()
+        _forget(resource, flow)
+        raise
+    resource.stats["admitted"] += 1
+    resource.stats["wait_seconds"] += time.monotonic() - queued_at
+
+
+def _release(resource: _Resource, flow: tuple, seconds: float) -> None:
+    resource.running -= 1
+    _forget(resource, flow)
+    resource.service = 0.8 * resource.service + 0.2 * seconds
+    resource.dispatch()
+
+
+@asynccontextmanager
+async def slot(resource_name: str):
+    """
+    Hold one slot of a resource for the duration of the block.
+    Raises:
+        Overloaded: If the resource's queue is too long to accept the work.
+    """
+    resource = _resources[resource_name]
+    requester = _requester.get()
+    await _acquire(resource, requester)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _release(resource, requester.flow, time.monotonic() - started)
+
+
+async def run(resource_name: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """
+    Await ``func(*args, **kwargs)`` while holding a slot of the resource, e.g.
+    ``await run("grammar", run_blocking, score_cv, text)``.
+    """
+    async with slot(resource_name):
+        return await func(*args, **kwargs)
+
+
+def scheduler_stats() -> Dict[str, dict]:
+    return {
+        name: dict(
+            resource.stats,
+            limit=resource.limit,
+            running=resource.running,
+            waiting=resource.queued(),
+            service_seconds=round(resource.service, 2),
+        )
+        for name, resource in _resources.items()
+    }
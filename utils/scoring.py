@@ -1,76 +1,60 @@
-import re
-import language_tool_python
+from typing import Optional
+
+from utils.grammar import count_grammar_errors
+from utils.text_analyzer import analyze_cv
 
 def extract_contact_info(cv_text: str) -> dict:
     """
     Extracts email, phone number, and LinkedIn URL from the CV text.
     Returns a dictionary with the found information.
     """
+    features = analyze_cv(cv_text)
     info = {}
-
-    # Extract email
-    email_match = re.search(r'\b[\w.-]+@[\w.-]+\.\w+\b', cv_text)
-    if email_match:
-        info['email'] = email_match.group(0)
-
-    # Extract phone number (simple version, adjust for your region)
-    phone_match = re.search(r'\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{2,4}\)?[\s-]?)?\d{3,4}[\s-]?\d{3,4}\b', cv_text)
-    if phone_match:
-        info['phone'] = phone_match.group(0)
-
-    # Extract LinkedIn URL
-    linkedin_match = re.search(r'(https?://)?(www\.)?linkedin\.com/in/[A-Za-z0-9_-]+', cv_text)
-    if linkedin_match:
-        info['linkedin'] = linkedin_match.group(0)
-
+    if features.email:
+        info['email'] = features.email
+    if features.phone:
+        info['phone'] = features.phone
+    if features.linkedin:
+        info['linkedin'] = features.linkedin
     return info
 
-def score_cv(cv_text: str) -> int:
+def score_cv(cv_text: str, grammar_errors: Optional[int] = None) -> int:
     """
     Improved scoring function for a CV.
     Returns a score out of 100.
+    Args:
+        cv_text (str): The extracted text from the CV.
+        grammar_errors (int, optional): Issue count from count_grammar_errors, if already known.
     """
-    score = 0
-    # Define synonyms/keywords for each section
-    section_keywords = {
-        'education': ['education', 'academic', 'studies', 'school', 'university', 'college'],
-        'experience': ['experience', 'work history', 'employment', 'professional background', 'career'],
-        'skills': ['skills', 'abilities', 'competencies', 'proficiencies', 'expertise'],
-        'projects': ['projects', 'portfolio', 'works', 'case studies', 'assignments']
-    }
-    text = cv_text.lower()
-    for keywords in section_keywords.values():
-        if any(keyword in text for keyword in keywords):
-            score += 20  # 20 points per section found
+    features = analyze_cv(cv_text)
+    score = 20 * len(features.sections)  # 20 points per section found
 
     # Example: Add points for length
-    if 500 < len(cv_text) < 3000:
+    if 500 < features.char_count < 3000:
         score += 20
 
     # 1. **Contact Information**
-    if re.search(r'\b\w+@\w+\.\w+\b', text):  # Email
+    if features.has_plain_email:
         score += 5
-    if re.search(r'\b\d{10,}\b', text):  # Phone number (simple check)
+    if features.has_long_number:  # Phone
         score += 5
-    if 'linkedin.com' in text:
+    if features.mentions_linkedin:
         score += 5
 
     # 2. **Summary or Objective Section**
-    if any(word in text for word in ['summary', 'objective', 'profile']):
+    if features.has_summary:
         score += 5
 
     # 3. **Achievements or Awards**
-    if any(word in text for word in ['achievement', 'award', 'honor', 'certification']):
+    if features.has_achievements:
         score += 5
 
     # 4. **Formatting Quality**
-    if any(bullet in text for bullet in ['•', '- ', '* ']):
+    if features.has_bullets:
         score += 5
 
     # Grammar checking
-    tool = language_tool_python.LanguageTool('en-US')
-    matches = tool.check(cv_text)
-    num_errors = len(matches)
+    num_errors = count_grammar_errors(cv_text) if grammar_errors is None else grammar_errors
 
     # Subtract points for too many grammar/spelling errors
     if num_errors > 10:
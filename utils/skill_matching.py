@@ -0,0 +1,206 @@
+"""
+Skill normalization and fuzzy matching.
+
+Raw skills from the LLM ("Python 3", "python programming", "PostgreSQL DB")
+are first mapped onto a canonical vocabulary with aliases. The remaining
+differences are handled by comparing character n-gram vectors: every skill is
+embedded once into a cached row, and a whole job-versus-CV comparison is a
+single matrix product with a similarity threshold.
+"""
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# canonical name -> aliases (all lowercase, already normalized)
+CANONICAL_SKILLS: Dict[str, List[str]] = {
+    "python": ["python3", "py", "cpython"],
+    "javascript": ["js", "ecmascript", "es6", "java script", "vanilla js"],
+    "typescript": ["ts"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["reactjs", "react.js", "react js"],
+    "vue.js": ["vue", "vuejs", "vue js"],
+    "angular": ["angularjs", "angular.js"],
+    "c++": ["cpp", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "postgresql": ["postgres", "postgre sql", "psql"],
+    "mysql": ["my sql"],
+    "sql": ["structured query language", "sql queries"],
+    "nosql": ["no sql"],
+    "mongodb": ["mongo"],
+    "kubernetes": ["k8s", "kube"],
+    "docker": ["docker containers", "containerization"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "ci/cd": ["ci cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "git": ["github", "gitlab", "version control"],
+    "rest api": ["rest", "restful", "restful api", "rest apis", "restful apis"],
+    "graphql": ["graph ql"],
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "artificial intelligence": ["ai"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pytorch": ["torch"],
+    "tensorflow": ["tf"],
+    "pandas": [],
+    "numpy": [],
+    "excel": ["microsoft excel", "ms excel"],
+    "power bi": ["powerbi"],
+    "linux": ["unix", "gnu/linux"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "communication": ["communication skills", "verbal communication", "written communication"],
+    "teamwork": ["team work", "team player", "collaboration"],
+    "project management": ["managing projects"],
+    "agile": ["scrum", "agile methodologies", "kanban"],
+}
+
+# Skills that imply others: a CV listing PostgreSQL satisfies a job asking for SQL
+IMPLIED_SKILLS: Dict[str, List[str]] = {
+    "postgresql": ["sql"],
+    "mysql": ["sql"],
+    "typescript": ["javascript"],
+    "react": ["javascript"],
+    "vue.js": ["javascript"],
+    "angular": ["javascript", "typescript"],
+    "node.js": ["javascript"],
+    "pytorch": ["deep learning", "machine learning"],
+    "tensorflow": ["deep learning", "machine learning"],
+    "scikit-learn": ["machine learning"],
+    "kubernetes": ["docker"],
+}
+
+# Words that do not change which skill is meant
+_FILLER = {
+    "programming", "language", "languages", "development", "developer", "framework",
+    "frameworks", "experience", "skills", "skill", "knowledge", "proficiency", "basic",
+    "advanced", "strong", "good", "solid", "expert", "the", "of", "in", "with", "and",
+}
+_VERSION = re.compile(r"^v?\d+(\.\d+)*[a-z]?$")
+
+# Cosine similarity of character n-gram vectors above which two skills match
+MATCH_THRESHOLD = 0.75
+VECTOR_DIM = 512
+_NGRAM = 3
+
+_ALIASES: Dict[str, str] = {}
+for _canonical, _aliases in CANONICAL_SKILLS.items():
+    _ALIASES[_canonical] = _canonical
+    for _alias in _aliases:
+        _ALIASES[_alias] = _canonical
+
+_vectors: Dict[str, np.ndarray] = {}
+_vectors_lock = threading.Lock()
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Lowercase a skill and strip punctuation and extra whitespace,
+    keeping characters that matter in names like "C++", "C#" or "node.js".
+    """
+    skill = re.sub(r"[^\w+#./ -]", " ", skill.lower())
+    return " ".join(skill.strip(" .-/").split())
+
+
+def canonicalize(skill: str) -> str:
+    """
+    Map a raw skill onto the canonical vocabulary.
+    "Python 3", "python programming" and "Python3" all become "python";
+    skills that are not in the vocabulary are returned normalized.
+    """
+    skill = normalize_skill(re.sub(r"\(.*?\)", " ", skill)) or normalize_skill(skill)
+    if skill in _ALIASES:
+        return _ALIASES[skill]
+    words = [w for w in skill.replace("-", " ").replace("_", " ").split()
+             if w not in _FILLER and not _VERSION.match(w)]
+    reduced = " ".join(words)
+    if reduced in _ALIASES:
+        return _ALIASES[reduced]
+    return reduced or skill
+
+
+def canonical_skills(skills: Iterable[str], implied: bool = False) -> set:
+    """
+    Canonicalize a collection of skills, optionally adding the skills they imply.
+    """
+    result = {canonicalize(s) for s in skills} - {""}
+    if implied:
+        result = result.union(*(IMPLIED_SKILLS.get(s, ()) for s in result))
+    return result
+
+
+def _embed_one(skill: str) -> np.ndarray:
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    padded = f" {skill} "
+    for i in range(max(1, len(padded) - _NGRAM + 1)):
+        vector[zlib.crc32(padded[i:i + _NGRAM].encode("utf-8")) % VECTOR_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed(skills: List[str]) -> np.ndarray:
+    """
+    Return a (len(skills), VECTOR_DIM) matrix of unit vectors, one row per
+    canonical skill. Rows are computed once per skill and cached.
+    """
+    with _vectors_lock:
+        for skill in skills:
+            if skill not in _vectors:
+                _vectors[skill] = _embed_one(skill)
+        if not skills:
+            return np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        return np.stack([_vectors[skill] for skill in skills])
+
+
+def similarity(a: List[str], b: List[str]) -> np.ndarray:
+    """
+    Cosine similarity between every canonical skill in a and in b.
+    """
+    return embed(a) @ embed(b).T
+
+
+def match_skills(job_skills: Iterable[str], cv_skills: Iterable[str],
+                 threshold: float = MATCH_THRESHOLD) -> Tuple[float, Dict[str, str], List[str]]:
+    """
+    Match job skills against CV skills.
+    Args:
+        job_skills: Raw skills from the job description.
+        cv_skills: Raw skills from the CV.
+        threshold (float): Minimum similarity for a fuzzy match.
+    Returns:
+        tuple: (match percentage, {job skill: matching CV skill}, missing job skills),
+        all in canonical form.
+    """
+    job = sorted(canonical_skills(job_skills))
+    cv = sorted(canonical_skills(cv_skills, implied=True))
+    if not job:
+        return 0.0, {}, []
+    if not cv:
+        return 0.0, {}, job
+
+    sim = similarity(job, cv)
+    best = sim.argmax(axis=1)
+    best_sim = sim[np.arange(len(job)), best]
+    matched = {job[i]: cv[best[i]] for i in np.flatnonzero(best_sim >= threshold)}
+    missing = [skill for skill in job if skill not in matched]
+    return len(matched) / len(job) * 100, matched, missing
+
+
+def expand(job_skills: Iterable[str], vocabulary: List[str],
+           threshold: float = MATCH_THRESHOLD) -> Dict[str, str]:
+    """
+    Map every vocabulary skill that matches one of the job skills to that
+    job skill. Used to look up fuzzy matches in the candidate index.
+    """
+    job = sorted(canonical_skills(job_skills))
+    if not job or not vocabulary:
+        return {}
+    sim = similarity(vocabulary, job)
+    best = sim.argmax(axis=1)
+    best_sim = sim[np.arange(len(vocabulary)), best]
+    return {vocabulary[i]: job[best[i]] for i in np.flatnonzero(best_sim >= threshold)}
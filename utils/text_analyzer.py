@@ -0,0 +1,113 @@
+"""
+CV text analysis shared by scoring, format checking and contact extraction.
+
+The text is lowercased once and every label the bot looks for (section names,
+summary and achievement words, bullet markers, LinkedIn mentions) is checked
+against it with substring searches that stop at the first keyword found for
+that label. The contact patterns are searched once on the original text. The
+result is a CVFeatures record that all consumers read from, so a CV analyzed
+for scoring is not scanned again for the format check or contact info.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
+
+SECTION_KEYWORDS = {
+    'education': ['education', 'academic', 'studies', 'school', 'university', 'college'],
+    'experience': ['experience', 'work history', 'employment', 'professional background', 'career'],
+    'skills': ['skills', 'abilities', 'competencies', 'proficiencies', 'expertise'],
+    'projects': ['projects', 'portfolio', 'works', 'case studies', 'assignments']
+}
+SUMMARY_KEYWORDS = ['summary', 'objective', 'profile']
+ACHIEVEMENT_KEYWORDS = ['achievement', 'award', 'honor', 'certification']
+BULLET_MARKERS = ['•', '- ', '* ']
+# !cvformatcheck counts any dash or asterisk, not just list markers
+FORMAT_BULLET_MARKERS = ['•', '-', '*']
+LINKEDIN_MARKER = 'linkedin.com'
+
+EMAIL_RE = re.compile(r'\b[\w.-]+@[\w.-]+\.\w+\b')
+# Simple version, adjust for your region
+PHONE_RE = re.compile(r'\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{2,4}\)?[\s-]?)?\d{3,4}[\s-]?\d{3,4}\b')
+LINKEDIN_RE = re.compile(r'(https?://)?(www\.)?linkedin\.com/in/[A-Za-z0-9_-]+')
+# Stricter patterns used by score_cv; PHONE_RE also matches date ranges like "2018-2020"
+SCORE_EMAIL_RE = re.compile(r'\b\w+@\w+\.\w+\b')
+# Same matches as r'\b\d{10,}\b'; starting on a digit lets re skip ahead to the next digit
+LONG_NUMBER_RE = re.compile(r'\d(?<!\w\d)\d{9,}(?!\w)')
+
+
+@dataclass(frozen=True)
+class CVFeatures:
+    sections: Tuple[str, ...]
+    has_summary: bool
+    has_achievements: bool
+    has_bullets: bool
+    has_bullet_chars: bool
+    mentions_linkedin: bool
+    has_plain_email: bool
+    has_long_number: bool
+    email: Optional[str]
+    phone: Optional[str]
+    linkedin: Optional[str]
+    word_count: int
+    char_count: int
+
+
+def _label_keywords() -> Dict[str, Tuple[str, ...]]:
+    keywords: Dict[str, Tuple[str, ...]] = {
+        section: tuple(words) for section, words in SECTION_KEYWORDS.items()
+    }
+    keywords["summary"] = tuple(SUMMARY_KEYWORDS)
+    keywords["achievement"] = tuple(ACHIEVEMENT_KEYWORDS)
+    keywords["bullet"] = tuple(BULLET_MARKERS)
+    keywords["linkedin"] = (LINKEDIN_MARKER,)
+    return keywords
+
+
+_LABEL_KEYWORDS = _label_keywords()
+
+
+def find_labels(text: str) -> FrozenSet[str]:
+    """
+    Return the labels (section names, "summary", "achievement", "bullet",
+    "linkedin") of every keyword occurring in the lowercased text.
+    """
+    # Substring search runs in C and stops at the first keyword of each label;
+    # a regex alternation or an Aho-Corasick walk over every match measured slower
+    return frozenset(
+        label for label, keywords in _LABEL_KEYWORDS.items() if any(keyword in text for keyword in keywords)
+    )
+
+
+def _first(pattern: re.Pattern, text: str) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(0) if match else None
+
+
+@lru_cache(maxsize=64)
+def analyze_cv(cv_text: str) -> CVFeatures:
+    """
+    Analyze CV text once and return the features used by scoring,
+    format checking and contact extraction.
+    Args:
+        cv_text (str): The extracted text from the CV.
+    Returns:
+        CVFeatures: The feature record.
+    """
+    labels = find_labels(cv_text.lower())
+    return CVFeatures(
+        sections=tuple(section for section in SECTION_KEYWORDS if section in labels),
+        has_summary="summary" in labels,
+        has_achievements="achievement" in labels,
+        has_bullets="bullet" in labels,
+        has_bullet_chars=any(marker in cv_text for marker in FORMAT_BULLET_MARKERS),
+        mentions_linkedin="linkedin" in labels,
+        # \w covers both cases, so this pattern does not need the lowered text
+        has_plain_email=SCORE_EMAIL_RE.search(cv_text) is not None,
+        has_long_number=LONG_NUMBER_RE.search(cv_text) is not None,
+        email=_first(EMAIL_RE, cv_text),
+        phone=_first(PHONE_RE, cv_text),
+        linkedin=_first(LINKEDIN_RE, cv_text),
+        word_count=len(cv_text.split()),
+        char_count=len(cv_text),
+    )
@@ -0,0 +1,122 @@
+"""
+Two-tier key/value cache: an in-memory LRU in front of a size-capped SQLite
+file. Values must be JSON-serializable. Used by the CV cache and the LLM
+generation cache.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_MISSING = object()
+
+
+class TieredCache:
+    def __init__(self, path: str, memory_entries: int, disk_max_bytes: int):
+        """
+        Args:
+            path (str): SQLite file for the on-disk tier (created on first use).
+            memory_entries (int): Entries kept in the in-memory LRU.
+            disk_max_bytes (int): Size budget of the on-disk tier; least
+                recently used entries are evicted beyond it.
+        """
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _get_db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Any:
+        """
+        Return the cached value for key, or None if it is not cached.
+        """
+        with self._lock:
+            value = self._memory.get(key, _MISSING)
+            if value is not _MISSING:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return value
+            try:
+                db = self._get_db()
+                row = db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+            except sqlite3.Error:
+                logging.exception("An error occurred while reading %s.", self.path)
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            value = json.loads(row[0])
+            self._stats["disk_hits"] += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value in both tiers.
+        """
+        encoded = json.dumps(value)
+        with self._lock:
+            self._remember(key, value)
+            try:
+                db = self._get_db()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, encoded, len(encoded), time.time()),
+                )
+                self._evict(db)
+                db.commit()
+            except sqlite3.Error:
+                logging.exception("An error occurred while writing %s.", self.path)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        # Drop least recently used rows until the disk tier is back under 90% of its budget
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        target = self.disk_max_bytes * 0.9
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= target:
+                break
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss counters for both tiers and the overall hit rate.
+        """
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,138 @@
+"""
+Shared ingestion of uploaded CV attachments.
+
+Attachments are read straight into memory and parsed from the bytes; only
+uploads above SPILL_TO_DISK_BYTES go through a temporary file. Oversized
+files and documents with too many pages are rejected before any text is
+extracted. Extraction stops once MAX_TEXT_CHARS of text have been read, and
+the pages of long documents are split across idle PDF workers.
+"""
+import asyncio
+import math
+import os
+import tempfile
+from typing import Tuple, Union
+
+import discord
+
+from utils import cv_cache, metrics, scheduler
+from utils.cv_processor import PageLimitExceeded, count_pages, extract_text_from_pdf
+from utils.executors import pool_stats, run_pdf
+
+MAX_UPLOAD_BYTES = int(os.environ.get("CVBOT_MAX_UPLOAD_BYTES", 10 * 2**20))
+MAX_PAGES = int(os.environ.get("CVBOT_MAX_PAGES", 20))
+SPILL_TO_DISK_BYTES = int(os.environ.get("CVBOT_SPILL_TO_DISK_BYTES", 4 * 2**20))
+# Text kept per document; every consumer reads far less than this
+MAX_TEXT_CHARS = int(os.environ.get("CVBOT_MAX_TEXT_CHARS", 40000))
+# Pages read by the first task; the rest of a longer document is split across idle workers
+PAGES_PER_TASK = int(os.environ.get("CVBOT_PDF_PAGES_PER_TASK", 4))
+
+
+def is_pdf(data: bytes) -> bool:
+    return data.startswith(b"%PDF")
+
+
+class UploadRejected(Exception):
+    """
+    Raised when an upload is refused before parsing.
+    The message is meant to be shown to the user.
+    """
+
+
+def _extract_head(source: Union[bytes, str], max_pages: int, max_chars: int, stop: int) -> Tuple[str, int]:
+    # Runs in the PDF worker pool; small uploads arrive as bytes, large ones as a path
+    pages = count_pages(source)
+    if pages > max_pages:
+        raise PageLimitExceeded(pages, max_pages)
+    return extract_text_from_pdf(source, max_chars=max_chars, stop=stop), pages
+
+
+def _extract_range(source: Union[bytes, str], start: int, stop: int, max_chars: int) -> str:
+    return extract_text_from_pdf(source, max_chars=max_chars, start=start, stop=stop)
+
+
+def _split(start: int, stop: int, parts: int) -> list:
+    size = math.ceil((stop - start) / parts)
+    return [(first, min(first + size, stop)) for first in range(start, stop, size)]
+
+
+async def _extract_pages(source: Union[bytes, str]) -> str:
+    max_chars = MAX_TEXT_CHARS
+    head, pages = await run_pdf(_extract_head, source, MAX_PAGES, max_chars, PAGES_PER_TASK)
+    if pages <= PAGES_PER_TASK or len(head) >= max_chars:
+        return head
+    # Only idle workers take part, so one long upload does not hold up everyone else's
+    stats = pool_stats()["pdf"]
+    idle = max(1, stats["workers"] - stats["in_flight"])
+    ranges = _split(PAGES_PER_TASK, pages, min(idle, math.ceil((pages - PAGES_PER_TASK) / PAGES_PER_TASK)))
+    rest = await asyncio.gather(
+        *(run_pdf(_extract_range, source, start, stop, max_chars - len(head)) for start, stop in ranges)
+    )
+    return (head + "".join(rest))[:max_chars]
+
+
+async def read_pdf_attachment(attachment: discord.Attachment) -> bytes:
+    """
+    Read an uploaded PDF into memory, refusing files over MAX_UPLOAD_BYTES.
+    """
+    if attachment.size > MAX_UPLOAD_BYTES:
+        raise UploadRejected(
+            f"Your file is too large ({attachment.size / 2**20:.1f} MB). "
+            f"Please upload a PDF under {MAX_UPLOAD_BYTES / 2**20:.0f} MB."
+        )
+    with metrics.span("download"):
+        data = await attachment.read()
+    if not is_pdf(data):
+        raise UploadRejected("This file doesn't look like a valid PDF. Please upload a PDF document.")
+    return data
+
+
+async def extract_pdf_bytes(data: bytes) -> str:
+    """
+    Extract text from PDF bytes on the PDF worker pool.
+    Raises:
+        UploadRejected: If the document has more than MAX_PAGES pages.
+        Overloaded: If too many PDFs are already waiting.
+    """
+    temp_path = None
+    try:
+        async with scheduler.slot("pdf"):
+            with metrics.span("extract"):
+                if len(data) > SPILL_TO_DISK_BYTES:
+                    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                        tmp.write(data)
+                        temp_path = tmp.name
+                    return await _extract_pages(temp_path)
+                return await _extract_pages(data)
+    except PageLimitExceeded as e:
+        raise UploadRejected(
+            f"Your PDF has {e.pages} pages. Please upload a CV of at most {e.max_pages} pages."
+        )
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+async def load_cv_text(attachment: discord.Attachment) -> Tuple[str, str]:
+    """
+    Download an uploaded PDF and return its cache key and extracted text.
+    Text for a document that was seen before comes from the CV cache.
+    Args:
+        attachment (discord.Attachment): The uploaded PDF.
+    Returns:
+        tuple: (document key, extracted text)
+    Raises:
+        UploadRejected: If the file is too large, not a PDF or has too many pages.
+    """
+    return await load_cv_bytes(await read_pdf_attachment(attachment))
+
+
+async def load_cv_bytes(data: bytes) -> Tuple[str, str]:
+    """
+    Return the cache key and extracted text for PDF bytes already in memory.
+    Raises:
+        UploadRejected: If the document has more than MAX_PAGES pages.
+    """
+    doc = cv_cache.document_key(data)
+    text = await cv_cache.get_or_compute(doc, "text", lambda: extract_pdf_bytes(data))
+    return doc, text